@@ -0,0 +1,44 @@
+# ============================== Define helper ==============================
+from array import array
+
+
+class CallSiteCounter:
+    """
+    Per call site counters for analyses that report a site once it was hit more than threshold times.
+    Sites are interned into small integer ids from (file, line) without building a string key, the counts
+    saturate at the threshold and a reported site is retired, so later hits only cost the id lookup.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.site_ids = {}  # key: file, value: {line: site id}
+        self.counts = array('q')
+        self.retired = bytearray()
+
+    def site(self, file_name, line_num) -> int:
+        lines = self.site_ids.get(file_name)
+        if lines is None:
+            lines = self.site_ids[file_name] = {}
+        site = lines.get(line_num)
+        if site is None:
+            site = lines[line_num] = len(self.counts)
+            self.counts.append(0)
+            self.retired.append(0)
+        return site
+
+    def hit(self, site) -> bool:
+        # Count a hit of site, return True only for the hit that goes over the threshold.
+        if self.retired[site]:
+            return False
+        if self.counts[site] < self.threshold:
+            self.counts[site] += 1
+            return False
+        self.retired[site] = 1
+        return True
+
+    def is_retired(self, site) -> bool:
+        return bool(self.retired[site])
+
+    def __len__(self):
+        return len(self.counts)
+# =========================================================================
@@ -0,0 +1,212 @@
+# ============================== Define spec ==============================
+from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.instrument.filters import only
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+import ast
+import importlib
+import importlib.util
+import os
+import tempfile
+import warnings
+
+
+"""
+    Runs the checkers as one analysis, so an instrumented site costs one DynaPyt dispatch instead of one per checker.
+    The handlers of every hook are collected once, from the hooks each checker overrides, and only the hooks that
+    have handlers are set on the dispatcher. The @only filters of the checkers are applied here, with a single lookup
+    of the callee name per event. Run it alone in place of the checkers, with an analyses file containing
+        dynapyt.analyses.CheckerDispatcher.CheckerDispatcher;checkers=<module.Class>,<module.Class>
+    dynapyt_dispatcher_analyses.txt runs the checkers of dynapyt_analyses.txt this way (DYNAPYT_DISPATCHER=1 in the
+    run scripts).
+"""
+
+
+# The hooks instrumented by Basic_Instrumentation
+HOOKS = [
+    "pre_call", "post_call", "read_identifier", "_in", "not_in", "equal", "not_equal",
+    "add", "add_assign", "enter_for", "exit_for", "end_execution",
+]
+
+# Position of the callee in the arguments of the hooks that can be filtered with @only
+CALLEE_INDEX = {"pre_call": 2, "post_call": 3}
+
+
+def parse_checkers(checkers: str) -> List[str]:
+    # The checkers of the checkers argument of the dispatcher, module.Class paths separated by commas
+    return [path.strip() for path in checkers.split(",") if path.strip()]
+
+
+def session_checkers() -> Optional[List[str]]:
+    """
+    The checkers run in the DynaPyt session, read from the analyses file of the session that the run scripts copy
+    to {tempdir}/dynapyt_analyses-{DYNAPYT_SESSION_ID}.txt, with a CheckerDispatcher line replaced by its checkers.
+    None if there is no session or no analyses file.
+    """
+    session_id = os.environ.get("DYNAPYT_SESSION_ID")
+    if session_id is None:
+        return None
+    analyses_file = os.path.join(tempfile.gettempdir(), f"dynapyt_analyses-{session_id}.txt")
+    if not os.path.isfile(analyses_file):
+        return None
+
+    checkers = []
+    with open(analyses_file) as f:
+        for line in f:
+            path, *options = line.strip().split(";")
+            if not path:
+                continue
+            if path.rsplit(".", 1)[-1] == CheckerDispatcher.__name__:
+                options = dict(option.split("=", 1) for option in options)
+                checkers += parse_checkers(options.get("checkers", ""))
+            else:
+                checkers.append(path)
+    return checkers
+
+
+@lru_cache(maxsize=None)
+def _hook_node(path: str, hook: str) -> Tuple[Optional[ast.FunctionDef], Dict[str, ast.expr]]:
+    # The definition of hook in the checker class at path and the names it can see, read from the source of the module.
+    module_name, class_name = path.rsplit(".", 1)
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except ModuleNotFoundError:
+        spec = None
+    if spec is None or spec.origin is None:
+        raise ImportError(f"Checker {path}: no module named {module_name}")
+    with open(spec.origin) as f:
+        module = ast.parse(f.read())
+    cls = next(node for node in module.body if isinstance(node, ast.ClassDef) and node.name == class_name)
+
+    names = {}  # key: name, value: the expression assigned to it at module or class level
+    for node in module.body + cls.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            names[node.targets[0].id] = node.value
+
+    hook_node = next((node for node in cls.body if isinstance(node, ast.FunctionDef) and node.name == hook), None)
+    return hook_node, names
+
+
+def only_patterns(path: str, hook: str) -> Optional[List[str]]:
+    """
+    The @only patterns of hook in the checker class at path (module.Class), None if the hook is not filtered.
+    They are read from the source, so the checker and its dependencies are not imported. The patterns must be a
+    literal list or a name assigned a literal list in the module or the class.
+    """
+    hook_node, names = _hook_node(path, hook)
+    if hook_node is None:
+        return None
+    for decorator in hook_node.decorator_list:
+        if isinstance(decorator, ast.Call) and getattr(decorator.func, "id", None) == "only":
+            if hook not in CALLEE_INDEX:
+                raise ValueError(f"{path}.{hook}: @only is only supported on {list(CALLEE_INDEX)}")
+            patterns = next((kw.value for kw in decorator.keywords if kw.arg == "patterns"), None)
+            if patterns is None:
+                patterns = decorator.args[0]
+            if isinstance(patterns, ast.Name):
+                patterns = names[patterns.id]
+            return list(ast.literal_eval(patterns))
+    return None
+
+
+def callee_patterns(hook: str, checkers: Optional[List[str]] = None) -> Optional[List[str]]:
+    """
+    Names of the callees whose calls one of the checkers (by default the ones of the DynaPyt session) handles in hook.
+    None if one of them handles every call, if there is no session or if the source of a checker cannot be found.
+    """
+    if checkers is None:
+        checkers = session_checkers()
+        if checkers is None:
+            return None
+    patterns = []
+    for path in checkers:
+        try:
+            hook_node = _hook_node(path, hook)[0]
+        except ImportError as e:
+            warnings.warn(f"{e}, every call is instrumented for {hook}")
+            return None
+        if hook_node is None:
+            continue
+        checker_patterns = only_patterns(path, hook)
+        if checker_patterns is None:
+            return None
+        patterns += [pattern for pattern in checker_patterns if pattern not in patterns]
+    return patterns
+
+
+def callee_filter(hook: str) -> Callable:
+    """
+    Decorator filtering a call hook of an instrumentation analysis to the callees the checkers of the DynaPyt session
+    handle, so the other call sites do not need to be instrumented for it. Nothing is filtered if one of the checkers
+    handles every call or if they cannot be told.
+    """
+    patterns = callee_patterns(hook)
+    if patterns is None:
+        return lambda func: func
+    return only(patterns=patterns)
+
+
+class CheckerDispatcher(BaseAnalysis):
+
+    def __init__(self, checkers: Optional[str] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        paths = parse_checkers(checkers or "")
+        if not paths:
+            raise ValueError(
+                "CheckerDispatcher needs the checkers to run, "
+                "e.g. dynapyt.analyses.CheckerDispatcher.CheckerDispatcher;checkers=<module.Class>,<module.Class>"
+            )
+        self.checkers = [self._load(path)(**kwargs) for path in paths]
+
+        for hook in HOOKS:
+            # (handler, @only patterns or None) of the checkers overriding the hook, in the order of the checkers
+            entries = [
+                (getattr(checker, hook), only_patterns(path, hook))
+                for path, checker in zip(paths, self.checkers)
+                if getattr(type(checker), hook, None) is not getattr(BaseAnalysis, hook, None)
+            ]
+            dispatch = self._dispatcher(hook, entries)
+            if dispatch is not None:
+                setattr(self, hook, dispatch)
+
+    @staticmethod
+    def _load(path: str) -> type:
+        module_name, class_name = path.rsplit(".", 1)
+        return getattr(importlib.import_module(module_name), class_name)
+
+    @staticmethod
+    def _dispatcher(hook: str, entries: List[Tuple[Callable, Optional[List[str]]]]) -> Optional[Callable]:
+        handlers = [handler for handler, patterns in entries if patterns is None]
+        names = {name for _, patterns in entries if patterns is not None for name in patterns}
+
+        if not names:
+            if not handlers:
+                return None
+            if len(handlers) == 1:
+                return handlers[0]
+
+            def dispatch(*args) -> Any:
+                result = None
+                for handler in handlers:
+                    result = handler(*args)
+                return result
+            return dispatch
+
+        # key: callee name, value: the handlers to call for it, unfiltered ones included
+        handlers_by_name: Dict[str, List[Callable]] = {
+            name: [handler for handler, patterns in entries if patterns is None or name in patterns] for name in names
+        }
+        callee_index = CALLEE_INDEX[hook]
+
+        def dispatch(*args) -> Any:
+            result = None
+            try:
+                called = handlers_by_name.get(getattr(args[callee_index], "__name__", None), handlers)
+            except TypeError:  # __name__ is not hashable
+                called = handlers
+            for handler in called:
+                result = handler(*args)
+            return result
+        return dispatch
+# =========================================================================
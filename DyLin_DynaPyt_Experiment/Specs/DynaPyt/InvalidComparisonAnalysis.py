@@ -1,11 +1,11 @@
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 
 import operator
 import types
 from typing import Any, Callable
 import math
 import numpy as np
-import warnings
 
 """
 Name: 
@@ -28,14 +28,15 @@ and https://vald-phoenix.github.io/pylint-errors/plerr/errors/basic/R0124
 TODO: fix testcases
 """
 
+# Checks that apply to a pair of operand types.
+CHECK_FLOATS = 1
+FUNCTION_MISMATCH = 2
+CHECK_TYPES = 4
 
-class InvalidComparisonAnalysis(BaseAnalysis):
+
+class InvalidComparisonAnalysis(ViolationRecorder, BaseAnalysis):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         self.nmb_comparisons = 0
         self.stack_levels = 20
@@ -47,6 +48,9 @@ class InvalidComparisonAnalysis(BaseAnalysis):
             "LessThanEqual",
             "NotEqual",
         ]
+        # Which checks apply only depends on the types of the operands, so it is worked out once per
+        # pair of types and most comparisons (int == str, obj == obj, ...) have nothing left to check.
+        self.checks_by_types = {}  # key: (type(left), type(right)), value: CHECK_* flags
 
     def not_equal(self, dyn_ast: str, iid: int, left: Any, right: Any, result: Any) -> bool:
         self.equal(dyn_ast, iid, left, right, not result)
@@ -54,8 +58,16 @@ class InvalidComparisonAnalysis(BaseAnalysis):
     def equal(self, dyn_ast: str, iid: int, left: Any, right: Any, result: Any) -> bool:
         # print(f"{self.analysis_name} comparison {iid}")
         self.nmb_comparisons += 1
+
+        types_key = (type(left), type(right))
+        checks = self.checks_by_types.get(types_key)
+        if checks is None:
+            checks = self.checks_by_types[types_key] = self.checks_for(*types_key)
+        if not checks:
+            return
+
         try:
-            if (self._is_float(left) or self._is_float(right)):
+            if checks & CHECK_FLOATS:
                 if self.check_inf(left) or self.check_inf(right):
                     # Removed as DyLin does not use this analysis
                     '''
@@ -87,100 +99,57 @@ class InvalidComparisonAnalysis(BaseAnalysis):
                     '''
                     pass
 
-                if self.compare_floats(left, right):
-                    # Add the event to the event dictionary
-                    if "violation" not in self.event:
-                        self.event["violation"] = 1
-                    else:
-                        self.event["violation"] += 1
+                if left != right and math.isclose(left, right, rel_tol=1e-8):
+                    self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                        f'compared floats nearly equal {left} and {right}'
+                        f'File {call_file_name}, line {call_line_num}.'))
 
-                    # Add the violation to the violation dictionary
-                    self.violation += 1
+            if checks & CHECK_TYPES and left != right:
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'compared with type {left} and {right}'
+                    f'File {call_file_name}, line {call_line_num}.'))
 
-                    # Find the file name and line number of the function in the original file
-                    call_file_name = dyn_ast
-                    call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
+            if checks & FUNCTION_MISMATCH:
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'compared with function {left} and {right}'
+                    f'File {call_file_name}, line {call_line_num}.'))
 
-                    # Add the violation to the unique violation dictionary
-                    violation_key = f'{call_file_name}:{call_line_num}'
-                    if violation_key not in self.unique_event:
-                        self.unique_event[violation_key] = 1
-                        self.unique_violation += 1  # Increment the unique violation count
-                    else:
-                        self.unique_event[violation_key] += 1
+        except ValueError:
+            return
 
-                    # Print the violation message
-                    warnings.warn(
-                        f'Spec - {self.__class__.__name__}: compared floats nearly equal {left} and {right}'
-                        f'File {call_file_name}, line {call_line_num}.')
+    def checks_for(self, left_type: type, right_type: type) -> int:
+        checks = 0
+        if issubclass(left_type, (float, np.floating)) and issubclass(right_type, (float, np.floating)):
+            checks |= CHECK_FLOATS
 
-            if self.compare_types(left, right):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: compared with type {left} and {right}'
-                    f'File {call_file_name}, line {call_line_num}.')
-
-            if self.compare_funct(left, right):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: compared with function {left} and {right}'
-                    f'File {call_file_name}, line {call_line_num}.')
+        # same as compare_funct, on the types
+        left_is_func = issubclass(left_type, types.FunctionType)
+        right_is_func = issubclass(right_type, types.FunctionType)
+        left_is_slot_type = issubclass(left_type, type(int.__abs__))
+        right_is_slot_type = issubclass(right_type, type(int.__abs__))
+        if (
+            left_is_func != right_is_func
+            and not (left_is_slot_type or right_is_slot_type)
+            and left_type is not type(None)
+            and right_type is not type(None)
+        ):
+            checks |= FUNCTION_MISMATCH
 
-        except ValueError:
-            return
+        if issubclass(left_type, type) and issubclass(right_type, type):
+            checks |= CHECK_TYPES
+
+        return checks
 
     def _is_float(self, f: any) -> bool:
         return isinstance(f, float) or isinstance(f, np.floating)
 
     def check_nan(self, num: float) -> bool:
-        # np.isnan handles python builtin floats and numpy floats
-        return self._is_float(num) and np.isnan(num)
+        # math.isnan handles python builtin floats and numpy floats
+        return self._is_float(num) and math.isnan(num)
 
     def check_inf(self, num: float) -> bool:
-        # np.isnan handles python builtin floats and numpy floats
-        return self._is_float(num) and np.isinf(num)
+        # math.isinf handles python builtin floats and numpy floats
+        return self._is_float(num) and math.isinf(num)
 
     def compare_floats(self, left: float, right: float) -> bool:
         return (
@@ -358,17 +327,3 @@ class InvalidComparisonAnalysis(BaseAnalysis):
 
             return True
         return False
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
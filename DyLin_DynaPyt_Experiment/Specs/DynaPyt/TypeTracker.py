@@ -0,0 +1,94 @@
+# ============================== Define helper ==============================
+from collections import OrderedDict
+import weakref
+
+
+class TypeTracker:
+    """
+    Element type of containers keyed by object identity, for analyses that check what is added to a list/set.
+    For every container it keeps the dominant type (the type of the first element seen) and whether all the
+    elements are instances of it, and updates both from the added items only, so a check never copies or
+    samples the container. The container is scanned once when it is first seen, and again when its length
+    shows it was changed without us seeing it (pop, remove, +=, ...). Containers that support weak references
+    are forgotten when they are garbage collected, and the table keeps at most max_entries containers.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        # key: id(container), value: [type(container), dominant type, homogeneous, min len, max len, finalizer or None]
+        self.entries = OrderedDict()
+
+    def add(self, container, items, in_place=True):
+        """
+        Check the sized iterable items being added to container, return (dominant_type, homogeneous, odd_types)
+        where homogeneous tells if container was homogeneous before the addition and odd_types are the types of
+        the items that are not instances of dominant_type. If in_place, the items are recorded as added.
+        """
+        entry = self._entry(container)
+        dominant_type, homogeneous = entry[1], entry[2]
+
+        if dominant_type is None:
+            # The container is empty, the first added item sets the type.
+            for item in items:
+                dominant_type = type(item)
+                break
+            else:
+                return None, True, []
+
+        odd_types = [type(item) for item in items if not isinstance(item, dominant_type)]
+
+        if in_place:
+            # A set does not grow when the item is already there, so the length ends up in a range.
+            length = len(container)
+            entry[1] = dominant_type
+            entry[2] = homogeneous and not odd_types
+            entry[3] = length
+            entry[4] = length + len(items)
+
+        return dominant_type, homogeneous, odd_types
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _entry(self, container):
+        key = id(container)
+        entry = self.entries.get(key)
+
+        if entry is not None and (entry[0] is not type(container) or not entry[3] <= len(container) <= entry[4]):
+            # The id was reused by another object or the container was changed behind our back.
+            self._forget(key)
+            entry = None
+
+        if entry is None:
+            dominant_type, homogeneous = self._scan(container)
+            length = len(container)
+            entry = [type(container), dominant_type, homogeneous, length, length, self._finalizer(container, key)]
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self._forget(next(iter(self.entries)))
+        else:
+            self.entries.move_to_end(key)
+
+        return entry
+
+    @staticmethod
+    def _scan(container):
+        dominant_type = None
+        for item in container:
+            if dominant_type is None:
+                dominant_type = type(item)
+            elif not isinstance(item, dominant_type):
+                return dominant_type, False
+        return dominant_type, True
+
+    def _finalizer(self, obj, key):
+        try:
+            return weakref.finalize(obj, self._forget, key)
+        except TypeError:  # The object does not support weak references.
+            return None
+
+    def _forget(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None and entry[5] is not None:
+            entry[5].detach()
+# =========================================================================
@@ -4,6 +4,13 @@ import numpy as np
 import types
 import math
 
+# Checks that apply to a pair of operand types.
+CHECK_INF_LEFT = 1
+CHECK_INF_RIGHT = 2
+CHECK_NEARLY_EQUAL = 4
+FUNCTION_MISMATCH = 8
+CHECK_TYPES = 16
+
 
 class InvalidComparisonAnalysis(Spec):
     """
@@ -13,6 +20,10 @@ class InvalidComparisonAnalysis(Spec):
     def __init__(self):
         super().__init__()
 
+        # Which checks apply only depends on the types of the operands, so it is worked out once per
+        # pair of types and most comparisons (int == str, obj == obj, ...) have nothing left to check.
+        self.checks_by_types = {}  # key: (type(left), type(right)), value: CHECK_* flags
+
         # PymopComparisonTracker will be injected by PyMOP at runtime when using ast strategy.
         # This spec is not supported with other strategies.
         @self.event_after(call(PymopComparisonTracker, r'(__pymop__eq__|__pymop__ne__)'))
@@ -23,24 +34,30 @@ class InvalidComparisonAnalysis(Spec):
             if left is None or right is None:
                 return False
 
-            if self._is_float(left) or self._is_float(right):
-                if self._is_inf(left) or self._is_inf(right):
-                    return {
-                        'verdict': VIOLATION,
-                        'custom_message': f"Float comparison with inf at {kw['call_file_name']}, {kw['call_line_num']}.",
-                        'filename': kw['call_file_name'],
-                        'lineno': kw['call_line_num']
-                    }
-
-                if self._are_nearly_equal(left, right):
-                    return {
-                        'verdict': VIOLATION,
-                        'custom_message': f"Float comparison with nearly equal floats at {kw['call_file_name']}, {kw['call_line_num']}.",
-                        'filename': kw['call_file_name'],
-                        'lineno': kw['call_line_num']
-                    }
-
-            if self._compare_functions(left, right):
+            types_key = (type(left), type(right))
+            checks = self.checks_by_types.get(types_key)
+            if checks is None:
+                checks = self.checks_by_types[types_key] = self._checks_for(*types_key)
+            if not checks:
+                return False
+
+            if (checks & CHECK_INF_LEFT and math.isinf(left)) or (checks & CHECK_INF_RIGHT and math.isinf(right)):
+                return {
+                    'verdict': VIOLATION,
+                    'custom_message': f"Float comparison with inf at {kw['call_file_name']}, {kw['call_line_num']}.",
+                    'filename': kw['call_file_name'],
+                    'lineno': kw['call_line_num']
+                }
+
+            if checks & CHECK_NEARLY_EQUAL and self._are_nearly_equal(left, right):
+                return {
+                    'verdict': VIOLATION,
+                    'custom_message': f"Float comparison with nearly equal floats at {kw['call_file_name']}, {kw['call_line_num']}.",
+                    'filename': kw['call_file_name'],
+                    'lineno': kw['call_line_num']
+                }
+
+            if checks & FUNCTION_MISMATCH:
                 return {
                     'verdict': VIOLATION,
                     'custom_message': f"Comparison between function and non-function at {kw['call_file_name']}, {kw['call_line_num']}.",
@@ -48,7 +65,7 @@ class InvalidComparisonAnalysis(Spec):
                     'lineno': kw['call_line_num']
                 }
 
-            if self._compare_types(left, right):
+            if checks & CHECK_TYPES and left != right:
                 return {
                     'verdict': VIOLATION,
                     'custom_message': f"Comparison between incompatible types at {kw['call_file_name']}, {kw['call_line_num']}.",
@@ -58,34 +75,44 @@ class InvalidComparisonAnalysis(Spec):
 
             return False
 
-    def _is_float(self, x):
-        return isinstance(x, float) or isinstance(x, np.floating)
+    def _checks_for(self, left_type, right_type):
+        checks = 0
 
-    def _is_inf(self, x):
-        return self._is_float(x) and np.isinf(x)
+        left_is_float = self._is_float_type(left_type)
+        right_is_float = self._is_float_type(right_type)
+        if left_is_float:
+            checks |= CHECK_INF_LEFT
+        if right_is_float:
+            checks |= CHECK_INF_RIGHT
+        if left_is_float and right_is_float:
+            checks |= CHECK_NEARLY_EQUAL
+
+        if self._compare_functions(left_type, right_type):
+            checks |= FUNCTION_MISMATCH
+
+        if issubclass(left_type, type) and issubclass(right_type, type):
+            checks |= CHECK_TYPES
+
+        return checks
+
+    def _is_float_type(self, t):
+        return issubclass(t, (float, np.floating))
 
     def _are_nearly_equal(self, a, b):
-        return (
-            self._is_float(a)
-            and self._is_float(b)
-            and a != b
-            and math.isclose(a, b, rel_tol=1e-8)
-        )
+        # math works on Python and NumPy floats alike, without going through NumPy for plain floats
+        return a != b and math.isclose(a, b, rel_tol=1e-8)
 
-    def _compare_functions(self, left, right):
-        left_is_func = isinstance(left, types.FunctionType)
-        right_is_func = isinstance(right, types.FunctionType)
+    def _compare_functions(self, left_type, right_type):
+        left_is_func = issubclass(left_type, types.FunctionType)
+        right_is_func = issubclass(right_type, types.FunctionType)
 
-        left_is_slot = isinstance(left, type(int.__abs__))
-        right_is_slot = isinstance(right, type(int.__abs__))
+        left_is_slot = issubclass(left_type, type(int.__abs__))
+        right_is_slot = issubclass(right_type, type(int.__abs__))
 
         if left_is_func != right_is_func and not (left_is_slot or right_is_slot):
             return True
         return False
 
-    def _compare_types(self, left, right):
-        return isinstance(left, type) and isinstance(right, type) and left != right
-
     def match(self, call_file_name, call_line_num, args, kwargs, custom_message):
         print(f"Spec - {self.__class__.__name__}: Suspicious or invalid comparison because of {custom_message}. file {call_file_name}, line {call_line_num}.")
 
@@ -1,11 +1,13 @@
 # ============================== Define spec ==============================
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.CheckerDispatcher import callee_filter
 
 from typing import Any, Callable, Tuple, Dict, Iterable, List, Optional
 
 
 """
     This is a basic instrumentation spec that instruments the pre-call and post-call of a function.
+    The call hooks are only instrumented for the callees the checkers of the DynaPyt session handle.
 """
 
 
@@ -14,11 +16,13 @@ class Basic_Instrumentation(BaseAnalysis):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
 
+    @callee_filter("pre_call")
     def pre_call(
         self, dyn_ast: str, iid: int, function: Callable, pos_args: Tuple, kw_args: Dict
     ) -> None:
         pass
 
+    @callee_filter("post_call")
     def post_call(
         self, dyn_ast: str, iid: int, result: Any, call: Callable, pos_args: Tuple, kw_args: Dict
     ) -> Any:
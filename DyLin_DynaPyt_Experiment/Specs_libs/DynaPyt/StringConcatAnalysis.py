@@ -1,8 +1,9 @@
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.CallSiteCounter import CallSiteCounter
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 from dynapyt.instrument.filters import only
 
 from typing import Any
-import warnings
 
 """
 Name: 
@@ -25,18 +26,14 @@ Discussion:
 """
 
 
-class StringConcatAnalysis(BaseAnalysis):
+class StringConcatAnalysis(ViolationRecorder, BaseAnalysis):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
-        self.concats = {}
         self.adds = {}
         self.last_add_operation = None
         self.threshold = 10000
+        self.concats = CallSiteCounter(self.threshold)
 
     def add_assign(self, dyn_ast: str, iid: int, left: Any, right: Any) -> None:
         # for some reason left is a lambda
@@ -45,46 +42,7 @@ class StringConcatAnalysis(BaseAnalysis):
 
     def _check(self, dyn_ast: str, iid: int, right: Any, result: Any = None) -> None:
         if isinstance(right, type("")):
-            key = str(iid) + "_" + dyn_ast
-            if key not in self.concats:
-                self.concats[key] = 1
-            elif self.concats[key] != -1:
-                self.concats[key] += 1
-            if self.concats[key] > self.threshold:
-                # Add the event to the event dictionary
-                if "string_concat" not in self.event:
-                    self.event["string_concat"] = 1
-                else:
-                    self.event["string_concat"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(f'Spec - {self.__class__.__name__}: Attempted to concat strings alot with + operator at file {call_file_name}, line {call_line_num}.')
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+            # a site is reported once, like in DyLin, then retired
+            if self.concats.hit(self.concats.site(dyn_ast, iid)):
+                self.record_violation("string_concat", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Attempted to concat strings alot with + operator at file {call_file_name}, line {call_line_num}.'))
@@ -0,0 +1,79 @@
+# ============================== Define helper ==============================
+from array import array
+import warnings
+
+from dynapyt.analyses.StatisticsSink import statistics_sink
+
+
+class ViolationRecorder:
+    """
+    Mixin for the analyses, listed before BaseAnalysis, that keeps the events and violations they report and
+    hands them to the statistics sink of the process in end_execution. The location of an iid is looked up once per
+    (dyn_ast, iid) and violations are counted per location in an array. The warning message of a location is
+    only built for its first violation, and the warnings are deferred to end_execution, one per location with its
+    count, so a violation, even the first one of a location, never issues a warning in the monitored code and one
+    that keeps happening costs a few dict and array operations. A run that never reaches end_execution (killed by
+    a timeout or a crash) reports no warning.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.event = {}
+        self.violation = 0
+        self.unique_violation = 0
+
+        self.locations_by_iid = {}  # key: (dyn_ast, iid), value: location id
+        self.locations = {}  # key: 'file:line', value: location id
+        self.location_counts = array('q')  # location id -> number of violations
+        self.location_messages = []  # location id -> warning message of the first violation
+
+    @property
+    def unique_event(self):
+        return {key: self.location_counts[location] for key, location in self.locations.items()}
+
+    def record_violation(self, event, dyn_ast, iid, message) -> None:
+        """
+        Record a violation counted as event at iid of dyn_ast. message is called with the file name and the
+        line number of the violation, only if it is the first one at that line, and returns the warning text.
+        """
+        self.event[event] = self.event.get(event, 0) + 1
+        self.violation += 1
+
+        location = self.locations_by_iid.get((dyn_ast, iid))
+        if location is None:
+            location = self.locations_by_iid[(dyn_ast, iid)] = self._location(dyn_ast, iid, message)
+        self.location_counts[location] += 1
+
+    def _location(self, dyn_ast, iid, message) -> int:
+        call_line_num = self.iid_to_location(dyn_ast, iid).start_line
+        key = f'{dyn_ast}:{call_line_num}'
+        location = self.locations.get(key)
+        if location is None:
+            location = self.locations[key] = len(self.location_counts)
+            self.location_counts.append(0)
+            self.location_messages.append(f'Spec - {self.__class__.__name__}: {message(dyn_ast, call_line_num)}')
+            self.unique_violation += 1
+        return location
+
+    def statistics(self) -> dict:
+        # Statistics of the analysis, analyses add theirs by extending this dict.
+        return {
+            "DynaPyt_Event_Count": sum(self.event.values()),
+            "DynaPyt_Event": self.event,
+            "DynaPyt_Unique_Event": self.unique_event,
+            "DynaPyt_Violation_Count": self.violation,
+            "DynaPyt_Unique_Violation_Count": self.unique_violation,
+        }
+
+    def end_execution(self) -> None:
+        # Report the statistics, with the violations keyed by message like in PyMOP's -violations.json
+        violations = {}
+        for message, count in zip(self.location_messages, self.location_counts):
+            violation = violations.setdefault(message, {"count": 0})
+            violation["count"] += count
+        statistics_sink.report(self.__class__.__name__, self.event, violations, self.statistics())
+
+        # Print the violation messages
+        for message, count in zip(self.location_messages, self.location_counts):
+            warnings.warn(message if count == 1 else f'{message} ({count} violations at this location)')
+# =========================================================================
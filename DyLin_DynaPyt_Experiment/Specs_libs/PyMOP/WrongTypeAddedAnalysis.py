@@ -1,85 +1,135 @@
 # ============================== Define spec ==============================
 from array import array
-from collections import deque
-from pythonmop import Spec, call, getKwOrPosArg, VIOLATION
+from collections import deque, OrderedDict
+from pythonmop import Spec, call, getKwOrPosArg, VIOLATION, FALSE_EVENT
 import inspect
-import random
+import weakref
 
 ALLOWED_TYPES = (list, deque, set, array)
 
-# Add a seed to the random number generator
-random.seed(35)
 
-class WrongTypeAddedAnalysis(Spec):
+class TypeTracker:
     """
-    Warns if a value of a different type is added to a list/set that was previously homogeneous.
+    Element type of containers keyed by object identity, for analyses that check what is added to a list/set.
+    For every container it keeps the dominant type (the type of the first element seen) and whether all the
+    elements are instances of it, and updates both from the added items only, so a check never copies or
+    samples the container. The container is scanned once when it is first seen, and again when its length
+    shows it was changed without us seeing it (pop, remove, +=, ...). Containers that support weak references
+    are forgotten when they are garbage collected, and the table keeps at most max_entries containers.
     """
-    def __init__(self):
-        super().__init__()
 
-        self.THRESHOLD = 10
-
-        @self.event_before(call(PymopFuncCallTracker, 'before_call'))
-        def check_append(**kw):
-            func = kw['args'][1]
-            try:
-                func_self = getattr(func, "__self__", None)
-                func_name = getattr(func, "__name__", None)
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        # key: id(container), value: [type(container), dominant type, homogeneous, min len, max len, finalizer or None]
+        self.entries = OrderedDict()
+
+    def add(self, container, items, in_place=True):
+        """
+        Check the sized iterable items being added to container, return (dominant_type, homogeneous, odd_types)
+        where homogeneous tells if container was homogeneous before the addition and odd_types are the types of
+        the items that are not instances of dominant_type. If in_place, the items are recorded as added.
+        """
+        entry = self._entry(container)
+        dominant_type, homogeneous = entry[1], entry[2]
+
+        if dominant_type is None:
+            # The container is empty, the first added item sets the type.
+            for item in items:
+                dominant_type = type(item)
+                break
+            else:
+                return None, True, []
+
+        odd_types = [type(item) for item in items if not isinstance(item, dominant_type)]
+
+        if in_place:
+            # A set does not grow when the item is already there, so the length ends up in a range.
+            length = len(container)
+            entry[1] = dominant_type
+            entry[2] = homogeneous and not odd_types
+            entry[3] = length
+            entry[4] = length + len(items)
+
+        return dominant_type, homogeneous, odd_types
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _entry(self, container):
+        key = id(container)
+        entry = self.entries.get(key)
+
+        if entry is not None and (entry[0] is not type(container) or not entry[3] <= len(container) <= entry[4]):
+            # The id was reused by another object or the container was changed behind our back.
+            self._forget(key)
+            entry = None
+
+        if entry is None:
+            dominant_type, homogeneous = self._scan(container)
+            length = len(container)
+            entry = [type(container), dominant_type, homogeneous, length, length, self._finalizer(container, key)]
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self._forget(next(iter(self.entries)))
+        else:
+            self.entries.move_to_end(key)
 
-                if func_self is None or func_name is None:
-                    return
+        return entry
 
-                if isinstance(func_self, ALLOWED_TYPES) and func_name == "append":
-                    kw['func_self'] = func_self
-                    return self._check_add("append", **kw)
-            except:
-                pass
+    @staticmethod
+    def _scan(container):
+        dominant_type = None
+        for item in container:
+            if dominant_type is None:
+                dominant_type = type(item)
+            elif not isinstance(item, dominant_type):
+                return dominant_type, False
+        return dominant_type, True
 
-        @self.event_before(call(PymopFuncCallTracker, 'before_call'))
-        def check_insert(**kw):
-            func = kw['args'][1]
-            try:
-                func_self = getattr(func, "__self__", None)
-                func_name = getattr(func, "__name__", None)
+    def _finalizer(self, obj, key):
+        try:
+            return weakref.finalize(obj, self._forget, key)
+        except TypeError:  # The object does not support weak references.
+            return None
 
-                if func_self is None or func_name is None:
-                    return
+    def _forget(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None and entry[5] is not None:
+            entry[5].detach()
 
-                if isinstance(func_self, ALLOWED_TYPES) and func_name == "insert":
-                    kw['func_self'] = func_self
-                    return self._check_add("insert", **kw)
-            except:
-                pass
 
-        @self.event_before(call(PymopFuncCallTracker, 'before_call'))
-        def check_extend(**kw):
-            func = kw['args'][1]
-            try:
-                func_self = getattr(func, "__self__", None)
-                func_name = getattr(func, "__name__", None)
+class WrongTypeAddedAnalysis(Spec):
+    """
+    Warns if a value of a different type is added to a list/set that was previously homogeneous.
+    """
+    def __init__(self):
+        super().__init__()
 
-                if func_self is None or func_name is None:
-                    return
+        self.THRESHOLD = 10
+        self.types = TypeTracker()  # key: list/set, value: its element type and whether it is homogeneous
 
-                if isinstance(func_self, ALLOWED_TYPES) and func_name == "extend":
-                    kw['func_self'] = func_self
-                    return self._check_add("extend", **kw)
-            except:
-                pass
+        # PymopFuncCallTracker reports every call of the program, only these methods are checked: the
+        # name of the callee is looked up once and the other calls return FALSE_EVENT before any other
+        # work, so only the calls of these methods on a list/set are counted as events.
+        self.methods_by_name = {'append': 'append', 'insert': 'insert', 'extend': 'extend', 'add': 'add'}
 
         @self.event_before(call(PymopFuncCallTracker, 'before_call'))
-        def check_add(**kw):
+        def check_method(**kw):
             func = kw['args'][1]
             try:
+                method = self.methods_by_name.get(getattr(func, "__name__", None))
+                if method is None:
+                    return FALSE_EVENT
+
                 func_self = getattr(func, "__self__", None)
-                func_name = getattr(func, "__name__", None)
+                if func_self is None:
+                    return FALSE_EVENT
 
-                if func_self is None or func_name is None:
-                    return
+                if not isinstance(func_self, ALLOWED_TYPES):
+                    return FALSE_EVENT
 
-                if isinstance(func_self, ALLOWED_TYPES) and func_name == "add":
-                    kw['func_self'] = func_self
-                    return self._check_add("add", **kw)
+                kw['func_self'] = func_self
+                return self._check_add(method, **kw)
             except:
                 pass
 
@@ -98,64 +148,31 @@ class WrongTypeAddedAnalysis(Spec):
         if not hasattr(left, '__len__') or len(left) <= self.THRESHOLD:
             return False
 
-        if method in ('append'):
-            right = kw['args'][2][0]
+        if method in ('append', 'add'):
+            items = (kw['args'][2][0],)
         elif method == 'insert':
-            right = kw['args'][2][1]
-        elif method == 'add':
-            right = kw['args'][2][0]
+            items = (kw['args'][2][1],)
         elif method == 'extend':
-            right = kw['args'][2][0]
-            if "__len__" in dir(right):
-                right = list(right)
-            else:
+            items = kw['args'][2][0]
+            if not hasattr(items, '__len__'):
                 return False
         elif method == "add_assign":
-            right = kw['args'][2]
-            if type(right) != list:
+            items = kw['args'][2]
+            if type(items) != list or len(items) == 0:
                 return False
         else:
             return False
 
-        type_to_check = type(random.choice(list(left)))
-
-        # Optimization to reduce overhead for large lists sample size has to be lower than threshold from DyLin
-        left_sample = random.sample(list(left), self.THRESHOLD)
-        consistent_same_type_left = all(isinstance(n, type_to_check) for n in left_sample)
-
-        if consistent_same_type_left:
-            if method in ('append', 'add', 'insert'):
-                if not isinstance(right, type_to_check):
-                    return {
-                        "verdict": VIOLATION,
-                        'custom_message': f"Added potentially wrong type to a previously homogeneous list/set at {kw['call_file_name']}, {kw['call_line_num']}.",
-                        'filename': kw['call_file_name'],
-                        'lineno': kw['call_line_num']
-                    }
-            elif method == 'extend':
-                right_sample = right
-
-                # Right is so large, sample it
-                if hasattr(right, '__len__') and len(right) >= self.THRESHOLD:
-                    right_sample = random.sample(list(right), self.THRESHOLD)
-                consistent_same_type_right = all(isinstance(n, type_to_check) for n in right_sample)
-                if not consistent_same_type_right:
-                    return {
-                        "verdict": VIOLATION,
-                        'custom_message': f"Added potentially wrong type to a previously homogeneous list/set at {kw['call_file_name']}, {kw['call_line_num']}.",
-                        'filename': kw['call_file_name'],
-                        'lineno': kw['call_line_num']
-                    }
-            elif method == "add_assign":
-                if len(right) > 0:
-                    right_sample_type = type(right[0])
-                    if right_sample_type != type_to_check:
-                        return {
-                            "verdict": VIOLATION,
-                            'custom_message': f"Added potentially wrong type to a previously homogeneous list/set at {kw['call_file_name']}, {kw['call_line_num']}.",
-                            'filename': kw['call_file_name'],
-                            'lineno': kw['call_line_num']
-                        }
+        # left + right and left += right do not change left before the call, += is seen from the length later
+        _, consistent_same_type_left, odd_types = self.types.add(left, items, in_place=method != "add_assign")
+
+        if consistent_same_type_left and odd_types:
+            return {
+                "verdict": VIOLATION,
+                'custom_message': f"Added potentially wrong type to a previously homogeneous list/set at {kw['call_file_name']}, {kw['call_line_num']}.",
+                'filename': kw['call_file_name'],
+                'lineno': kw['call_line_num']
+            }
 
         return False
 
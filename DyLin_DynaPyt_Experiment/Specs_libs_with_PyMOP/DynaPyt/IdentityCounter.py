@@ -0,0 +1,80 @@
+# ============================== Define helper ==============================
+import weakref
+from collections import OrderedDict
+
+
+class IdentityCounter:
+    """
+    Per-object counters keyed by object identity, for analyses that accumulate a value per container,
+    without keeping the objects alive. The counter of an object that supports weak references is dropped
+    when the object is collected, so an object that reuses its id starts from zero. Plain lists, like the
+    other objects without weak references, are told apart by their type and their length: the counter
+    restarts when the object is seen shorter than the last time (a cleared list, or another list that
+    reuses the id). A longer list that reuses the id keeps the counter; for those the table is only bounded
+    by max_entries, dropping the least recently used counters, so its memory stays flat.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key: id(obj), value: [count, type, length, weak reference or None]
+
+    def add(self, obj, amount=1):
+        # Add amount to the counter of obj and return the new value.
+        key = id(obj)
+        entry = self._entry(obj, key)
+
+        if entry is None:
+            entry = [0, type(obj), None, self._weak_reference(obj, key)]
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+
+        if entry[3] is None:
+            entry[2] = self._length(obj)
+        entry[0] += amount
+        return entry[0]
+
+    def get(self, obj, default=0):
+        entry = self._entry(obj, id(obj))
+        if entry is None:
+            return default
+        return entry[0]
+
+    def _entry(self, obj, key):
+        # The entry of obj, None if there is none or if it belongs to another object that had the same id.
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is type(obj):
+            if entry[3] is not None:
+                if entry[3]() is obj:
+                    return entry
+            elif entry[2] is None or (self._length(obj) or 0) >= entry[2]:
+                return entry
+        del self.entries[key]
+        return None
+
+    def _weak_reference(self, obj, key):
+        # A weak reference that drops the entry of obj when obj is collected, None if obj does not support it.
+        try:
+            return weakref.ref(obj, lambda reference: self._drop(key, reference))
+        except TypeError:
+            return None
+
+    def _drop(self, key, reference):
+        entry = self.entries.get(key)
+        if entry is not None and entry[3] is reference:
+            del self.entries[key]
+
+    @staticmethod
+    def _length(obj):
+        try:
+            return len(obj)
+        except TypeError:
+            return None
+
+    def __len__(self):
+        return len(self.entries)
+# =========================================================================
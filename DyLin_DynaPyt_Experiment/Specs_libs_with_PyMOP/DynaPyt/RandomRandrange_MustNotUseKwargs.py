@@ -1,9 +1,9 @@
 # ============================== Define spec ==============================
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 from dynapyt.instrument.filters import only
 
 from typing import Callable, Tuple, Dict
-import warnings
 
 
 """
@@ -12,14 +12,7 @@ import warnings
 """
 
 
-class RandomRandrange_MustNotUseKwargs(BaseAnalysis):
-
-    def __init__(self, **kwargs) -> None:
-        super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
+class RandomRandrange_MustNotUseKwargs(ViolationRecorder, BaseAnalysis):
 
     @only(patterns=["randrange"])
     def pre_call(
@@ -39,43 +32,7 @@ class RandomRandrange_MustNotUseKwargs(BaseAnalysis):
 
             # Spec content
             if kw_args:
-                # Add the event to the event dictionary
-                if "test_verify" not in self.event:
-                    self.event["test_verify"] = 1
-                else:
-                    self.event["test_verify"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                            f'Spec - {self.__class__.__name__}: Keyword arguments should not be used in random.randrange because they '
-                            f'can be interpreted in unexpected ways. in {call_file_name} at line {call_line_num}')
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+                self.record_violation("test_verify", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Keyword arguments should not be used in random.randrange because they '
+                    f'can be interpreted in unexpected ways. in {call_file_name} at line {call_line_num}'))
 # =========================================================================
@@ -0,0 +1,47 @@
+# ============================== Define helper ==============================
+import json
+import os
+
+
+class StatisticsSink:
+    """
+    Statistics of all the analyses of a process, written to a single JSON Lines file, DynaPyt-{pid}.jsonl, with
+    one record per analysis in the format of PyMOP's -full.json and -violations.json:
+        {"spec": name, "monitors": 0, "events": {event: count}, "violations": {message: {"count": count}},
+         "statistics": {name: value}}
+    The records are kept in memory and the file is replaced with all of them whenever an analysis reports, so it
+    holds every analysis that reached end_execution and is never left half written.
+    scripts/dynapyt_statistics.py merges these files into -full.json and -violations.json files.
+    """
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self.records = {}  # key: analysis name, value: its record
+
+    @property
+    def path(self):
+        # The pid is read at every flush, a forked process does not overwrite the file of its parent.
+        return os.path.join(self.directory, f'DynaPyt-{os.getpid()}.jsonl')
+
+    def report(self, spec, events, violations, statistics) -> None:
+        self.records[spec] = {
+            "spec": spec,
+            "monitors": 0,
+            "events": events,
+            "violations": violations,
+            "statistics": statistics,
+        }
+        self.flush()
+
+    def flush(self) -> None:
+        path = self.path
+        with open(f'{path}.tmp', 'w') as f:
+            for record in self.records.values():
+                f.write(json.dumps(record, default=str))
+                f.write('\n')
+        os.replace(f'{path}.tmp', path)
+
+
+# The sink of the process, shared by all the analyses.
+statistics_sink = StatisticsSink()
+# =========================================================================
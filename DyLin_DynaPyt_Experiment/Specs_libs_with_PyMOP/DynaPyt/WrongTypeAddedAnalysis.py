@@ -1,10 +1,10 @@
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.TypeTracker import TypeTracker
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 from dynapyt.instrument.filters import only
 
 from typing import Any, Callable, Tuple, Dict
 import types
-import random
-import warnings
 """
 Name: 
 Wrong type added
@@ -26,22 +26,15 @@ How large is sufficiently large? N=1000?
 function_names = ["append", "extend", "insert", "add"]
 
 
-# Add a seed to the random number generator
-random.seed(35)
-
-
-class WrongTypeAddedAnalysis(BaseAnalysis):
+class WrongTypeAddedAnalysis(ViolationRecorder, BaseAnalysis):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         self.nmb_add = 0
         self.nmb_add_assign = 0
         self.nmb_functions = 0
         self.threshold = 10
+        self.types = TypeTracker()  # key: list/set, value: its element type and whether it is homogeneous
 
     @only(patterns=function_names)
     def pre_call(self, dyn_ast: str, iid: int, function: Callable, pos_args, kw_args):
@@ -49,60 +42,30 @@ class WrongTypeAddedAnalysis(BaseAnalysis):
         if isinstance(function, types.BuiltinFunctionType) and function.__name__ in function_names:
             list_or_set = function.__self__
 
-            if not "__len__" in dir(list_or_set) or len(list_or_set) <= self.threshold:
+            if not hasattr(list_or_set, "__len__") or len(list_or_set) <= self.threshold:
                 return
             self.nmb_functions += 1
 
-            type_to_check = type(random.choice(list(list_or_set)))
+            if function.__name__ in ["append", "add"]:
+                items = (pos_args[0],)
+            elif function.__name__ == "extend":
+                items = pos_args[0]
+                if not hasattr(items, "__len__"):
+                    # iterating it would consume it, the tracker resyncs from the length on the next call
+                    return
+            elif function.__name__ == "insert":
+                items = (pos_args[1],)
 
-            # optimization to reduce overhead for large lists sample size has to be lower than threshold
-            list_or_set = random.sample(list(list_or_set), self.threshold)
-            same_type = all(isinstance(n, type_to_check) for n in list_or_set)
+            type_to_check, same_type, odd_types = self.types.add(list_or_set, items)
 
             if same_type:
-                type_ok = True
-                if function.__name__ in ["append", "add"]:
-                    type_ok = isinstance(pos_args[0], type_to_check)
-                    if not type_ok:
-                        odd_type = type(pos_args[0])
-                elif function.__name__ == "extend":
-                    sample = pos_args[0]
-                    if "__len__" in dir(sample) and len(sample) >= self.threshold:
-                        sample = random.sample(list(pos_args[0]), self.threshold)
-                    type_ok = all(isinstance(n, type_to_check) for n in sample)
-                    if not type_ok:
-                        odd_type = [type(n) for n in sample]
-                elif function.__name__ == "insert":
-                    type_ok = isinstance(pos_args[1], type_to_check)
-                    if not type_ok:
-                        odd_type = type(pos_args[1])
-
+                type_ok = not odd_types
                 if not type_ok:
-                    # Add the event to the event dictionary
-                    if "violation" not in self.event:
-                        self.event["violation"] = 1
-                    else:
-                        self.event["violation"] += 1
-
-                    # Add the violation to the violation dictionary
-                    self.violation += 1
-
-                    # Find the file name and line number of the function in the original file
-                    call_file_name = dyn_ast
-                    call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                    # Add the violation to the unique violation dictionary
-                    violation_key = f'{call_file_name}:{call_line_num}'
-                    if violation_key not in self.unique_event:
-                        self.unique_event[violation_key] = 1
-                        self.unique_violation += 1  # Increment the unique violation count
-                    else:
-                        self.unique_event[violation_key] += 1
-
-                    # Print the violation message
-                    warnings.warn(
-                        f'Spec - {self.__class__.__name__}: Added potentially wrong type {odd_type} to list of type {type_to_check} in {dyn_ast}. '
-                        f'File {call_file_name}, line {call_line_num}.')
+                    odd_type = odd_types if function.__name__ == "extend" else odd_types[0]
+
+                    self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                        f'Added potentially wrong type {odd_type} to list of type {type_to_check} in {dyn_ast}. '
+                        f'File {call_file_name}, line {call_line_num}.'))
 
     def add_assign(self, dyn_ast: str, iid: int, left: Any, right: Any) -> Any:
         # for some reason left is a lambda
@@ -117,54 +80,16 @@ class WrongTypeAddedAnalysis(BaseAnalysis):
 
             self.nmb_add += 1
 
-            type_to_check = type(right)
-            if type_to_check == list and len(right) > 0:
-                type_to_check = type(right[0])
-            else:
+            if type(right) != list or len(right) == 0:
                 return
-            one_type = type(random.choice(left))
-            random_subset = random.sample(left, self.threshold)
-            homogeneous = all(isinstance(n, one_type) for n in random_subset)
-            same_type = all(isinstance(n, type_to_check) for n in random_subset)
+
+            # left + right and left += right do not change left before the call, += is seen from the length later
+            type_to_check, homogeneous, odd_types = self.types.add(left, right, in_place=False)
+            same_type = not odd_types
+            odd_type = odd_types[0] if odd_types else None
 
             # before addition types where the same, if not after addition we may have a problem
             if homogeneous and not same_type:
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Added potentially wrong type {odd_type} to list of type {type_to_check} in {dyn_ast}. '
-                    f'File {call_file_name}, line {call_line_num}.')
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Added potentially wrong type {odd_type} to list of type {type_to_check} in {dyn_ast}. '
+                    f'File {call_file_name}, line {call_line_num}.'))
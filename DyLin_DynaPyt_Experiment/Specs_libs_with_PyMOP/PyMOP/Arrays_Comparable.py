@@ -1,5 +1,6 @@
 # ============================== Define spec ==============================
 from pythonmop import VIOLATION, Spec, call
+from itertools import combinations_with_replacement
 import builtins
 
 
@@ -11,28 +12,139 @@ class Arrays_Comparable(Spec):
 
     def __init__(self):
         super().__init__()
+        self.comparable_type_pairs = {}  # key: (type, type), value: True if their instances can be compared
 
         @self.event_before(call(builtins, 'sorted'))
         def invalid_sorted(**kw):
             objs = kw['args'][0]  # Store the elements in the list.
             if isinstance(objs, list):
-                new_objs = objs[:]  # Shallow copy the elements in the list inputted.
+                new_objs = objs
                 if kw['kwargs'].get('key'):  # If a key method for comparison is provided.
-                    key = kw['kwargs']['key']  # Store the key method.
-                    for i in range(len(new_objs)):  # Convert the elements using the inputted key method.
-                        new_objs[i] = key(new_objs[i])
-                try:  # Check if the object is comparable.
-                    for i in range(len(new_objs)):
-                        for j in range(i + 1, len(new_objs)):
-                            # This will raise a TypeError if elements at i and j are not comparable.
-                            _ = new_objs[i] < new_objs[j]
-                except TypeError:
+                    new_objs = list(map(kw['kwargs']['key'], objs))  # Convert the elements using the inputted key method.
+                if not self._all_comparable(new_objs):
                     # Return true if it is not comparable for a violation.
                     return {'verdict': VIOLATION, 
                             'custom_message': f"Array with non-comparable elements is about to be sorted at {kw['call_file_name']}, {kw['call_line_num']}.",
                             'filename': kw['call_file_name'],
                             'lineno': kw['call_line_num']}
 
+    def _all_comparable(self, objs):
+        """
+        Return False if two elements of objs cannot be compared with < (sorted compares in both directions).
+        Whether the instances of two types can be compared is decided once per pair of types, on one sample of
+        each (cached across calls). Tuples and lists are compared like tuple and list comparisons do it: item by
+        item up to the first position where they differ, so only those items have to be comparable.
+        """
+        kinds = {t: self._comparison_type(t) for t in set(map(type, objs))}
+        comparison_types = set(kinds.values())
+        samples = None
+
+        for type_a, type_b in combinations_with_replacement(comparison_types, 2):
+            if type_a is type_b and type_a in (tuple, list):
+                continue  # Checked item by item below.
+            comparable = self.comparable_type_pairs.get((type_a, type_b))
+            if comparable is None or (not comparable and type_a is type_b):
+                if samples is None:
+                    samples = self._type_samples(objs, kinds, len(comparison_types))
+                if type_a is type_b and len(samples[type_a]) < 2:
+                    continue  # A single element does not need to be compared with its own type.
+                if comparable is None:
+                    first, second = samples[type_a][0], samples[type_b][-1]
+                    comparable = self._can_compare(first, second) and self._can_compare(second, first)
+                    self.comparable_type_pairs[(type_a, type_b)] = comparable
+                    self.comparable_type_pairs[(type_b, type_a)] = comparable
+            if not comparable:
+                return False
+
+        for kind in (tuple, list):
+            if kind in comparison_types:
+                sequences = [obj for obj in objs if kinds[type(obj)] is kind]
+                if not self._sequences_comparable(sequences, 0):
+                    return False
+        return True
+
+    def _sequences_comparable(self, sequences, position):
+        """
+        Return False if two of sequences, whose items before position are equal, cannot be compared.
+        Two sequences are decided by the items at the first position where they differ: the items at position
+        that are not equal must be comparable, and the sequences whose items at position are equal are checked
+        at the next position.
+        """
+        sequences = [sequence for sequence in sequences if len(sequence) > position]
+        if len(sequences) < 2:
+            return True
+        groups = self._group_by_item(sequences, position)
+        if groups is None:
+            return False
+        if len(groups) > 1 and not self._all_comparable([group[0][position] for group in groups]):
+            return False
+        return all(self._sequences_comparable(group, position + 1) for group in groups if len(group) > 1)
+
+    def _group_by_item(self, sequences, position):
+        # The sequences grouped by their item at position, equal items are in the same group.
+        # None if the items cannot be hashed and two unequal ones cannot be compared.
+        groups = {}
+        try:
+            for sequence in sequences:
+                groups.setdefault(self._item_key(sequence[position]), []).append(sequence)
+            return list(groups.values())
+        except TypeError:  # The items cannot be hashed, they are grouped by equality.
+            groups = []
+            for sequence in sequences:
+                item = sequence[position]
+                for group in groups:
+                    first = group[0][position]
+                    if first is item or first == item:
+                        group.append(sequence)
+                        break
+                else:
+                    # Stop at the first unequal item that cannot be compared, not after grouping all of them.
+                    if groups and not self._all_comparable([groups[0][0][position], item]):
+                        return None
+                    groups.append([sequence])
+            return groups
+
+    @classmethod
+    def _item_key(cls, item):
+        # A hashable key, equal for equal items: a list is keyed by the keys of its items.
+        if type(item) is list:
+            return list, tuple(map(cls._item_key, item))
+        hash(item)  # This will raise a TypeError if item cannot be hashed.
+        return item
+
+    @staticmethod
+    def _comparison_type(cls):
+        # tuple or list if the instances of cls compare like one (namedtuples do), cls otherwise.
+        for kind in (tuple, list):
+            if issubclass(cls, kind):
+                if cls.__lt__ is kind.__lt__ and cls.__gt__ is kind.__gt__ and cls.__eq__ is kind.__eq__:
+                    return kind
+                return cls
+        return cls
+
+    @staticmethod
+    def _type_samples(objs, kinds, num_types):
+        # The first two elements of each comparison type.
+        samples = {}
+        full_groups = 0
+        for obj in objs:
+            group = samples.setdefault(kinds[type(obj)], [])
+            if len(group) < 2:
+                group.append(obj)
+                if len(group) == 2:
+                    full_groups += 1
+                    if full_groups == num_types:
+                        break
+        return samples
+
+    @staticmethod
+    def _can_compare(a, b):
+        try:
+            _ = a < b  # This will raise a TypeError if a and b are not comparable.
+            return True
+        except TypeError:
+            return False
+
     def match(self, call_file_name, call_line_num):
         print(
             f'Spec - {self.__class__.__name__}: Array with non-comparable elements is about to be sorted. '
@@ -53,6 +165,19 @@ try:
 except TypeError as e:
     pass
 
+# Tuples are compared item by item: (1, 'a') and (1, 2) differ at an int and a str, whatever their order in the list
+mixed_tuples = [(0, 0), (1, 'a'), (1, 2)]
+
+try:
+    # This will raise a TypeError because 'a' and 2 cannot be compared
+    sorted_list = sorted(mixed_tuples)
+except TypeError as e:
+    pass
+
+# No violation: the tuples are equal at their first item and the dicts are equal, so they are never ordered
+equal_tuples = [(1, {}), (1, {})]
+sorted_list = sorted(equal_tuples)
+
 spec_in.get_monitor().refresh_monitor() # only used in A
 
 '''
\ No newline at end of file
@@ -7,6 +7,8 @@ class ChangeListWhileIterating(BaseDyLinAnalysis):
     # PyLint has a check for this, code W4701
     # PyLint also has checks for dictionaries and sets (E4702, E4703). These seem more severe than the list check
     class ListMeta:
+        __slots__ = ("l", "length", "warned", "dyn_ast", "iid")
+
         def __init__(self, l: Iterable, length: int, dyn_ast: str, iid: int, warned: bool = False):
             self.l = l
             self.length = length
@@ -26,28 +28,20 @@ class ChangeListWhileIterating(BaseDyLinAnalysis):
 
         _list = iterable
         try:
-            if (
-                len(self.iterator_stack) == 0
-                or iid != self.iterator_stack[-1].iid
-                or dyn_ast != self.iterator_stack[-1].dyn_ast
-            ):
+            list_meta = self.iterator_stack[-1] if self.iterator_stack else None
+            if list_meta is None or iid != list_meta.iid or dyn_ast != list_meta.dyn_ast:
                 length = len(_list)
                 self.iterator_stack.append(self.ListMeta(_list, length, dyn_ast, iid))
-            elif len(self.iterator_stack) > 0:
-                list_meta: self.ListMeta = self.iterator_stack[-1]
-                if (
-                    list_meta.warned is False
-                    and len(_list) < list_meta.length
-                    and id(_list) == id(list_meta.l)
-                    and iterable == list_meta.l
-                ):
-                    self.add_finding(
-                        iid,
-                        dyn_ast,
-                        "A-22",
-                        f"List length changed while iterating initial length: {list_meta.length} current:{len(_list)}",
-                    )
-                    list_meta.warned = True
+            elif list_meta.warned is False and _list is list_meta.l and len(_list) < list_meta.length:
+                # Identity and the length at loop entry tell that the iterated list shrank, without comparing
+                # the list with itself element by element on every iteration.
+                self.add_finding(
+                    iid,
+                    dyn_ast,
+                    "A-22",
+                    f"List length changed while iterating initial length: {list_meta.length} current:{len(_list)}",
+                )
+                list_meta.warned = True
         # necessary for dynamically loaded lists during runtime which sometimes can not be compared in certain
         # test cases
         except Exception as e:
@@ -1,14 +1,16 @@
 # ============================== Define spec ==============================
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 from typing import Any, Iterable, Iterator, List, Optional
 
 import collections
-import warnings
 
-class ChangeListWhileIterating(BaseAnalysis):
+class ChangeListWhileIterating(ViolationRecorder, BaseAnalysis):
     # PyLint has a check for this, code W4701
     # PyLint also has checks for dictionaries and sets (E4702, E4703). These seem more severe than the list check
     class ListMeta:
+        __slots__ = ("l", "length", "warned", "dyn_ast", "iid")
+
         def __init__(self, l: Iterable, length: int, dyn_ast: str, iid: int, warned: bool = False):
             self.l = l
             self.length = length
@@ -18,10 +20,6 @@ class ChangeListWhileIterating(BaseAnalysis):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         # Stack of ListMeta objects
         self.iterator_stack: List[self.ListMeta] = []
@@ -33,47 +31,17 @@ class ChangeListWhileIterating(BaseAnalysis):
 
         _list = iterable
         try:
-            if (
-                len(self.iterator_stack) == 0
-                or iid != self.iterator_stack[-1].iid
-                or dyn_ast != self.iterator_stack[-1].dyn_ast
-            ):
+            list_meta = self.iterator_stack[-1] if self.iterator_stack else None
+            if list_meta is None or iid != list_meta.iid or dyn_ast != list_meta.dyn_ast:
                 length = len(_list)
                 self.iterator_stack.append(self.ListMeta(_list, length, dyn_ast, iid))
-            elif len(self.iterator_stack) > 0:
-                list_meta: self.ListMeta = self.iterator_stack[-1]
-                if (
-                    list_meta.warned is False
-                    and len(_list) < list_meta.length
-                    and id(_list) == id(list_meta.l)
-                    and iterable == list_meta.l
-                ):
-                    # Add the event to the event dictionary
-                    if "violation" not in self.event:
-                        self.event["violation"] = 1
-                    else:
-                        self.event["violation"] += 1
-
-                    # Add the violation to the violation dictionary
-                    self.violation += 1
-
-                    # Find the file name and line number of the function in the original file
-                    call_file_name = dyn_ast
-                    call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                    # Add the violation to the unique violation dictionary
-                    violation_key = f'{call_file_name}:{call_line_num}'
-                    if violation_key not in self.unique_event:
-                        self.unique_event[violation_key] = 1
-                        self.unique_violation += 1  # Increment the unique violation count
-                    else:
-                        self.unique_event[violation_key] += 1
-
-                    # Print the violation message
-                    warnings.warn(
-                        f'Spec - {self.__class__.__name__}: List length changed while iterating initial length: {list_meta.length} current:{len(_list)}'
-                        f'File {call_file_name}, line {call_line_num}.')
-                    list_meta.warned = True
+            elif list_meta.warned is False and _list is list_meta.l and len(_list) < list_meta.length:
+                # Identity and the length at loop entry tell that the iterated list shrank, without comparing
+                # the list with itself element by element on every iteration.
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'List length changed while iterating initial length: {list_meta.length} current:{len(_list)}'
+                    f'File {call_file_name}, line {call_line_num}.'))
+                list_meta.warned = True
 
         # necessary for dynamically loaded lists during runtime which sometimes can not be compared in certain
         # test cases
@@ -86,18 +54,4 @@ class ChangeListWhileIterating(BaseAnalysis):
             self.iterator_stack.pop()
 
     
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
-
 # =========================================================================
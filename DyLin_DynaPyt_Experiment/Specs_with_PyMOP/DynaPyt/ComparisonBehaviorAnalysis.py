@@ -1,21 +1,23 @@
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 
 from typing import Any
 import operator
 import numpy as np
-import warnings
 
-class ComparisonBehaviorAnalysis(BaseAnalysis):
+class ComparisonBehaviorAnalysis(ViolationRecorder, BaseAnalysis):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         self.excluded_types = [type(0.0), type(None)]
         self.stack_levels = 20
-        self.cache = {}
+        # Type pairs whose comparisons were checked without finding a violation are not checked again,
+        # except for a sample of revalidation_rate of their comparisons.
+        self.cache = {}  # key: (type(left), type(right), op), value: number of comparisons seen since it was cached
+        self.revalidation_rate = 0.01
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_revalidations = 0
 
     """
     TODO:
@@ -59,33 +61,38 @@ class ComparisonBehaviorAnalysis(BaseAnalysis):
         if self.is_excluded(left) or self.is_excluded(right):
             return None
 
-        try:
-            if self.check_symmetry(left, right, op, result):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
+        key = (type(left), type(right), op)
+        if self.is_cached(key):
+            return None
 
-                # Add the violation to the violation dictionary
-                self.violation += 1
+        violation_count = self.violation
+        self.check_comparison(dyn_ast, iid, left, op, right, result)
+        if self.violation == violation_count:
+            self.cache.setdefault(key, 0)
+        else:
+            self.cache.pop(key, None)
 
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
+    def is_cached(self, key) -> bool:
+        # True if the type pair is known to be well behaved and this comparison is not sampled for revalidation.
+        seen = self.cache.get(key)
+        if seen is None:
+            self.cache_misses += 1
+            return False
 
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
+        self.cache[key] = seen + 1
+        if int((seen + 1) * self.revalidation_rate) > int(seen * self.revalidation_rate):
+            self.cache_revalidations += 1
+            return False
 
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Bad symmetry for {op} with {left} {right}. '
-                    f'File {call_file_name}, line {call_line_num}.')
+        self.cache_hits += 1
+        return True
+
+    def check_comparison(self, dyn_ast: str, iid: int, left: Any, op: str, right: Any, result: Any) -> None:
+        try:
+            if self.check_symmetry(left, right, op, result):
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Bad symmetry for {op} with {left} {right}. '
+                    f'File {call_file_name}, line {call_line_num}.'))
 
             if self.check_stability(left, right, op, result):
                 # Removed as DyLin does not use this analysis
@@ -119,112 +126,24 @@ class ComparisonBehaviorAnalysis(BaseAnalysis):
                 pass
 
             elif self.check_identity(left):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Bad identity {op} of {left} returned true when compared with None. '
-                    f'File {call_file_name}, line {call_line_num}.')
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Bad identity {op} of {left} returned true when compared with None. '
+                    f'File {call_file_name}, line {call_line_num}.'))
 
             elif self.check_identity(right):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Bad identity {op} of {left} returned true when compared with None. '
-                    f'File {call_file_name}, line {call_line_num}.')
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Bad identity {op} of {left} returned true when compared with None. '
+                    f'File {call_file_name}, line {call_line_num}.'))
 
             elif self.check_reflexivity(left):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Bad reflexivity {left} {op} to itself. '
-                    f'File {call_file_name}, line {call_line_num}.')
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Bad reflexivity {left} {op} to itself. '
+                    f'File {call_file_name}, line {call_line_num}.'))
 
             elif self.check_reflexivity(right):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: Bad reflexivity {right} {op} to itself. '
-                    f'File {call_file_name}, line {call_line_num}.')
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Bad reflexivity {right} {op} to itself. '
+                    f'File {call_file_name}, line {call_line_num}.'))
 
         except ValueError:
             # some libraries e.g. pandas do not allow to do all kinds of comparisons e.g. pandas.series == None
@@ -253,17 +172,13 @@ class ComparisonBehaviorAnalysis(BaseAnalysis):
                     return True
         return False
 
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+    def statistics(self) -> dict:
+        checks = self.cache_hits + self.cache_misses + self.cache_revalidations
+        hit_rate = self.cache_hits / checks if checks else 0.0
 
+        statistics = super().statistics()
+        statistics["DynaPyt_Cache_Hits"] = self.cache_hits
+        statistics["DynaPyt_Cache_Misses"] = self.cache_misses
+        statistics["DynaPyt_Cache_Revalidations"] = self.cache_revalidations
+        statistics["DynaPyt_Cache_Hit_Rate"] = f"{hit_rate:.4f}"
+        return statistics
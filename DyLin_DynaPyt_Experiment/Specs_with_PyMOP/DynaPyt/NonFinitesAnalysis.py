@@ -1,37 +1,27 @@
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.NonFiniteChecker import NonFiniteChecker
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 
 from typing import Any, Callable, Dict, Tuple
 import pandas as pd
 import numpy as np
-import warnings
 
 
-class NonFinitesAnalysis(BaseAnalysis):
+class NonFinitesAnalysis(ViolationRecorder, BaseAnalysis):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         self.tracked_objects = {}
         self.total_values_investigated = 0
+        self.non_finites = NonFiniteChecker()
 
     def can_be_checked_with_numpy(self, value: any) -> bool:
         return isinstance(value, np.ndarray) or isinstance(value, pd.DataFrame)
 
     def numpy_check_not_finite(self, df: any) -> bool:
-        try:
-            is_inf = np.isinf(df)
-            self.total_values_investigated = self.total_values_investigated + 1
-            try:
-                # need to extract values from pandas.Dataframes first
-                result = True in is_inf.values
-                return result
-            except AttributeError as e:
-                return True in is_inf
-        except TypeError as e:
-            return False
+        # NaN, inf or -inf, checked chunk by chunk without a boolean copy of df
+        self.total_values_investigated = self.total_values_investigated + 1
+        return self.non_finites.is_not_finite(df)
 
     def check_np_issue_found(self, value: any) -> bool:
         if self.can_be_checked_with_numpy(value) and self.numpy_check_not_finite(value):
@@ -55,72 +45,14 @@ class NonFinitesAnalysis(BaseAnalysis):
 
         for arg in args:
             if self.check_np_issue_found(arg):
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: NaN in numpy or Dataframe object in input {arg}'
-                    f'File {call_file_name}, line {call_line_num}.')
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'NaN in numpy or Dataframe object in input {arg}'
+                    f'File {call_file_name}, line {call_line_num}.'))
 
                 no_nan_in_input = False
 
         if self.check_np_issue_found(result):
             if no_nan_in_input:
-                # Add the event to the event dictionary
-                if "violation" not in self.event:
-                    self.event["violation"] = 1
-                else:
-                    self.event["violation"] += 1
-
-                # Add the violation to the violation dictionary
-                self.violation += 1
-
-                # Find the file name and line number of the function in the original file
-                call_file_name = dyn_ast
-                call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                # Add the violation to the unique violation dictionary
-                violation_key = f'{call_file_name}:{call_line_num}'
-                if violation_key not in self.unique_event:
-                    self.unique_event[violation_key] = 1
-                    self.unique_violation += 1  # Increment the unique violation count
-                else:
-                    self.unique_event[violation_key] += 1
-
-                # Print the violation message
-                warnings.warn(
-                    f'Spec - {self.__class__.__name__}: NaN in numpy or Dataframe object in result, after applying function {function}'
-                    f'File {call_file_name}, line {call_line_num}.')
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+                self.record_violation("violation", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'NaN in numpy or Dataframe object in result, after applying function {function}'
+                    f'File {call_file_name}, line {call_line_num}.'))
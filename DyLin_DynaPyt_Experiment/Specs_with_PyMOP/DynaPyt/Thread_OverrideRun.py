@@ -1,12 +1,12 @@
 # ============================== Define spec ==============================
 from dynapyt.analyses.BaseAnalysis import BaseAnalysis
+from dynapyt.analyses.ViolationRecorder import ViolationRecorder
 from dynapyt.instrument.filters import only
 
 from typing import Callable, Tuple, Dict
 from inspect import getsource
 from hashlib import sha256
 import threading
-import warnings
 
 
 """
@@ -15,79 +15,59 @@ import warnings
 """
 
 
-class Thread_OverrideRun(BaseAnalysis):
+class Thread_OverrideRun(ViolationRecorder, BaseAnalysis):
 
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
-        self.event = {}
-        self.unique_event = {}
-        self.violation = 0
-        self.unique_violation = 0
 
         # Get the hash of the original run method for inspection
         self.original_run_method_hash = sha256(getsource(threading.Thread.run).encode()).hexdigest()
+        self.run_not_overridden = {}  # key: class, value: (its run attribute, verdict)
 
     @only(patterns=["start"])
     def pre_call(
         self, dyn_ast: str, iid: int, function: Callable, pos_args: Tuple, kw_args: Dict
     ) -> None:
-        # The target class names for monitoring
-        targets = ["threading.Thread"]
-
-        # Get the class name
+        # Get the class
         if hasattr(function, '__self__') and hasattr(function.__self__, '__class__'):
             cls = function.__self__.__class__
-            class_name = cls.__module__ + "." + cls.__name__
         else:
-            class_name = None
+            cls = None
 
-        # Check if the class name is the target ones
-        if class_name in targets:
+        # Check if the class is the target one and the run method of the thread is not overridden
+        if cls is not None and self._run_not_overridden(cls, function.__self__):
 
             # Spec content
             obj = function.__self__
-            sha = sha256(getsource(obj.run).encode()).hexdigest()
-            if sha == self.original_run_method_hash:  # method run not overridden
-                # argument 'target' not passed in constructor
-                if not hasattr(obj, '_target') or getattr(obj, '_target') is None:
-
-                    # Add the event to the event dictionary
-                    if "run" not in self.event:
-                        self.event["run"] = 1
-                    else:
-                        self.event["run"] += 1
-
-                    # Add the violation to the violation dictionary
-                    self.violation += 1
-
-                    # Find the file name and line number of the function in the original file
-                    call_file_name = dyn_ast
-                    call_line_num = BaseAnalysis.iid_to_location(self, dyn_ast, iid).start_line
-
-                    # Add the violation to the unique violation dictionary
-                    violation_key = f'{call_file_name}:{call_line_num}'
-                    if violation_key not in self.unique_event:
-                        self.unique_event[violation_key] = 1
-                        self.unique_violation += 1  # Increment the unique violation count
-                    else:
-                        self.unique_event[violation_key] += 1
-
-                    # Print the violation message
-                    warnings.warn(
-                        f'Spec - {self.__class__.__name__}: Thread run method not overridden or argument target not passed in constructor. '
-                        f'File {call_file_name}, line {call_line_num}.')
-
-    def end_execution(self) -> None:
-        # Count the number of events
-        event_count = 0
-        for key in self.event:
-            event_count += self.event[key]
-
-        # Write the statistics to a file
-        with open(f'{self.__class__.__name__}_statistics.txt', 'w') as f:
-            f.write(f"DynaPyt_Event_Count: {event_count}\n")
-            f.write(f'DynaPyt_Event: {self.event}\n')
-            f.write(f'DynaPyt_Unique_Event: {self.unique_event}\n')
-            f.write(f"DynaPyt_Violation_Count: {self.violation}\n")
-            f.write(f"DynaPyt_Unique_Violation_Count: {self.unique_violation}\n")
+            # argument 'target' not passed in constructor
+            if not hasattr(obj, '_target') or getattr(obj, '_target') is None:
+
+                self.record_violation("run", dyn_ast, iid, lambda call_file_name, call_line_num: (
+                    f'Thread run method not overridden or argument target not passed in constructor. '
+                    f'File {call_file_name}, line {call_line_num}.'))
+
+    def _run_not_overridden(self, cls, obj) -> bool:
+        # A run assigned on the thread itself replaces the one of its class, it is checked every time.
+        if 'run' in getattr(obj, '__dict__', ()):
+            return self._is_target(cls) and self._is_original_run(obj.run)
+
+        # The verdict is kept per class until its run method is replaced: the class name is not built
+        # and getsource does not read the source file again for every started thread.
+        run = getattr(cls, 'run', None)
+        cached = self.run_not_overridden.get(cls)
+        if cached is not None and cached[0] is run:
+            return cached[1]
+
+        verdict = self._is_target(cls) and self._is_original_run(run)
+        self.run_not_overridden[cls] = (run, verdict)
+        return verdict
+
+    def _is_target(self, cls) -> bool:
+        # The target class names for monitoring
+        targets = ["threading.Thread"]
+
+        return cls.__module__ + "." + cls.__name__ in targets
+
+    def _is_original_run(self, run) -> bool:
+        return run is threading.Thread.run or sha256(getsource(run).encode()).hexdigest() == self.original_run_method_hash
 # =========================================================================
@@ -1,5 +1,5 @@
 # ============================== Define spec ==============================
-from pythonmop import Spec, VIOLATION, call
+from pythonmop import Spec, VIOLATION, call, FALSE_EVENT
 import builtins
 
 
@@ -12,37 +12,32 @@ class BuiltinAllAnalysis(Spec):
     def __init__(self):
         super().__init__()
 
+        # PymopFuncCallTracker reports every call of the program, only the calls of these callables are checked.
+        # They are indexed by identity, so other calls cost one dict miss and no user __eq__/__hash__ is run.
+        # The other calls return FALSE_EVENT, so only the calls of all() and any() are counted as events.
+        self.checks_by_callee = {
+            id(builtins.all): self._check_empty_list,
+            id(builtins.any): self._check_empty_list,
+        }
+
         @self.event_after(call(PymopFuncCallTracker, 'after_call'))
         def violation(**kw):
-            return_val = kw['args'][1]
-            func = kw['args'][2]
-            args = kw['args'][3]
-            kwargs = kw['args'][4]
-            if func == builtins.all:
-                arg = args[0]
-                if isinstance(arg, type([])):
-                    flattened = self._flatten(arg)
-                    if len(flattened) == 0 and return_val == True:
-                        return {'verdict': VIOLATION, 
-                            'custom_message': f"Potentially unintended result for any() call at {kw['call_file_name']}, {kw['call_line_num']}.",
-                            'filename': kw['call_file_name'],
-                            'lineno': kw['call_line_num']}
-            
-        @self.event_after(call(PymopFuncCallTracker, 'after_call'))
-        def violation(**kw):
-            return_val = kw['args'][1]
-            func = kw['args'][2]
-            args = kw['args'][3]
-            kwargs = kw['args'][4]
-            if func == builtins.any:
-                arg = args[0]
-                if isinstance(arg, type([])):
-                    flattened = self._flatten(arg)
-                    if len(flattened) == 0 and return_val == True:
-                        return {'verdict': VIOLATION, 
-                            'custom_message': f"Potentially unintended result for any() call at {kw['call_file_name']}, {kw['call_line_num']}.",
-                            'filename': kw['call_file_name'],
-                            'lineno': kw['call_line_num']}
+            check = self.checks_by_callee.get(id(kw['args'][2]))
+            if check is None:
+                return FALSE_EVENT
+            return check(kw)
+
+    def _check_empty_list(self, kw):
+        return_val = kw['args'][1]
+        args = kw['args'][3]
+        arg = args[0]
+        if isinstance(arg, type([])):
+            flattened = self._flatten(arg)
+            if len(flattened) == 0 and return_val == True:
+                return {'verdict': VIOLATION, 
+                    'custom_message': f"Potentially unintended result for any() call at {kw['call_file_name']}, {kw['call_line_num']}.",
+                    'filename': kw['call_file_name'],
+                    'lineno': kw['call_line_num']}
 
     def _flatten(self, l):
         new_list = []
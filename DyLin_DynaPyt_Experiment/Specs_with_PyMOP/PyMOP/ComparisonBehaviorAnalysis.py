@@ -1,4 +1,4 @@
-from pythonmop import Spec, VIOLATION, call
+from pythonmop import Spec, VIOLATION, call, End
 import numpy as np
 
 
@@ -10,6 +10,14 @@ class ComparisonBehaviorAnalysis(Spec):
     def __init__(self):
         super().__init__()
 
+        # Type pairs whose comparisons were checked without finding a violation are not checked again,
+        # except for a sample of revalidation_rate of their comparisons.
+        self.cache = {}  # key: (type(left), type(right), op), value: number of comparisons seen since it was cached
+        self.revalidation_rate = 0.01
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_revalidations = 0
+
         @self.event_after(call(PymopComparisonTracker, r'__pymop__eq__'))
         def eq_end(**kw):
             return self.check_all(kw, "Equal")
@@ -18,6 +26,13 @@ class ComparisonBehaviorAnalysis(Spec):
         def ne_end(**kw):
             return self.check_all(kw, "NotEqual")
 
+        @self.event_before(call(End, 'end_execution'))
+        def end_execution(**kw):
+            checks = self.cache_hits + self.cache_misses + self.cache_revalidations
+            hit_rate = self.cache_hits / checks if checks else 0.0
+            print(f'Spec - {self.__class__.__name__}: verdict cache hits: {self.cache_hits}, misses: {self.cache_misses}, '
+                  f'revalidations: {self.cache_revalidations}, hit rate: {hit_rate:.4f}, type pairs: {len(self.cache)}.')
+
     def is_excluded(self, val: any) -> bool:
         return (
             type(val) is int
@@ -41,6 +56,33 @@ class ComparisonBehaviorAnalysis(Spec):
         if self.is_excluded(left) or self.is_excluded(right):
             return False
 
+        key = (type(left), type(right), op)
+        if self.is_cached(key):
+            return False
+
+        verdict = self.check_comparison(kw, left, right, result, op)
+        if verdict is False:
+            self.cache.setdefault(key, 0)
+        else:
+            self.cache.pop(key, None)
+        return verdict
+
+    def is_cached(self, key) -> bool:
+        # True if the type pair is known to be well behaved and this comparison is not sampled for revalidation.
+        seen = self.cache.get(key)
+        if seen is None:
+            self.cache_misses += 1
+            return False
+
+        self.cache[key] = seen + 1
+        if int((seen + 1) * self.revalidation_rate) > int(seen * self.revalidation_rate):
+            self.cache_revalidations += 1
+            return False
+
+        self.cache_hits += 1
+        return True
+
+    def check_comparison(self, kw: dict, left: any, right: any, result: any, op: str):
         try:
             if self.check_symmetry(left, right, op, result):
                 return {
@@ -1,5 +1,5 @@
 # ============================== Define spec ==============================
-from pythonmop import Spec, call, End
+from pythonmop import Spec, call, End, FALSE_EVENT
 from pythonmop.spec import spec
 from pythonmop.statistics import StatisticsSingleton
 
@@ -17,6 +17,9 @@ class InPlaceSortAnalysis(Spec):
         super().__init__()
         self.stored_lists = {}
         self.threshold = 1000
+        # The list read events only matter while a sorted() result is pending: the handler is
+        # disabled otherwise and drops the event before any other work.
+        self.list_reads_enabled = False
 
         @self.event_before(call(builtins, 'sorted'))
         def list_sorted(**kw):
@@ -26,13 +29,16 @@ class InPlaceSortAnalysis(Spec):
                     'file_name': kw['call_file_name'],
                     'line_num': kw['call_line_num'],
                 }
+                self.list_reads_enabled = True
 
         # read related events
         @self.event_before(call(list, r'(__len__|__contains__|__getitem__|__eq__|__ne__|__lt__|__le__|__gt__|__ge__|__iter__)' ))
         def list_used(**kw):
-            list_id = id(kw['args'][0])
-            if list_id in self.stored_lists:
-                self.stored_lists.pop(list_id, None)
+            if not self.list_reads_enabled:
+                return FALSE_EVENT
+
+            if self.stored_lists.pop(id(kw['args'][0]), None) is not None and not self.stored_lists:
+                self.list_reads_enabled = False
 
         @self.event_before(call(End, 'end_execution'))
         def end_execution(**kw):
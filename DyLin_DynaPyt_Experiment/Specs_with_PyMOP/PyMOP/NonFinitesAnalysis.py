@@ -1,6 +1,91 @@
 from pythonmop import Spec, call, VIOLATION
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
+import weakref
+
+
+class NonFiniteChecker:
+    """
+    Tells if a numpy array or a pandas DataFrame holds a NaN, inf or -inf, without building a boolean array
+    the size of the input. Float and complex arrays are reduced chunk by chunk: the sum of a chunk is finite
+    only if all its elements are, and the scan stops at the first chunk holding a non-finite value (a sum can
+    also overflow, the chunk is then checked element by element into a reused buffer). Other dtypes cannot
+    hold non-finite values. Results for arrays whose memory cannot change, read-only down to the owner of the
+    buffer, are cached by buffer address, shape, strides and dtype, so such an array is scanned only once.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()  # key: (buffer address, shape, strides, dtype), value: [result, finalizer]
+        self.buffer = np.empty(self.CHUNK_SIZE, dtype=bool)
+
+    def is_not_finite(self, value) -> bool:
+        if isinstance(value, np.ndarray):
+            return self._array_not_finite(value)
+        if isinstance(value, pd.DataFrame):
+            return self._frame_not_finite(value)
+        return False
+
+    def _array_not_finite(self, array) -> bool:
+        if array.dtype.kind not in 'fc':
+            return False
+
+        key = self._cache_key(array)
+        if key is None:
+            return self._scan(array)
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            return entry[0]
+
+        result = self._scan(array)
+        self.cache[key] = [result, weakref.finalize(array, self._forget, key)]
+        if len(self.cache) > self.max_entries:
+            self._forget(next(iter(self.cache)))
+        return result
+
+    def _frame_not_finite(self, frame) -> bool:
+        dtypes = list(frame.dtypes)
+        # np.isinf raises TypeError on frames with non numeric columns, they were never reported
+        if any(dtype.kind not in 'biufc' for dtype in dtypes):
+            return False
+        for index, dtype in enumerate(dtypes):
+            if dtype.kind in 'fc' and self._array_not_finite(frame.iloc[:, index].to_numpy()):
+                return True
+        return False
+
+    def _scan(self, array) -> bool:
+        chunks = np.nditer(array, flags=['external_loop', 'buffered', 'zerosize_ok'], buffersize=self.CHUNK_SIZE)
+        # the sums of the chunks must not warn about overflows in the monitored program
+        with np.errstate(over='ignore', invalid='ignore'):
+            for chunk in chunks:
+                if not np.isfinite(np.add.reduce(chunk)):
+                    is_finite = self.buffer[:chunk.size]
+                    np.isfinite(chunk, out=is_finite)
+                    if not is_finite.all():
+                        return True
+        return False
+
+    @staticmethod
+    def _cache_key(array):
+        # Only arrays that nothing can write to are cached.
+        base = array
+        while isinstance(base, np.ndarray):
+            if base.flags.writeable:
+                return None
+            base = base.base
+        if base is not None and not isinstance(base, bytes):
+            return None
+        return (array.__array_interface__['data'][0], array.shape, array.strides, array.dtype.str)
+
+    def _forget(self, key):
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            entry[1].detach()
 
 
 class NonFinitesAnalysis(Spec):
@@ -11,6 +96,8 @@ class NonFinitesAnalysis(Spec):
     def __init__(self):
         super().__init__()
 
+        self.non_finites = NonFiniteChecker()
+
         @self.event_before(call(PymopFuncCallTracker, 'after_call'))
         def non_finite_op(**kw):
             return_val = kw['args'][1]
@@ -45,18 +132,9 @@ class NonFinitesAnalysis(Spec):
     def can_be_checked_with_numpy(self, value: any) -> bool:
         return isinstance(value, np.ndarray) or isinstance(value, pd.DataFrame)
 
-    # copied as is from https://github.com/sola-st/DyLin/blob/main/src/dylin/analyses/NonFinitesAnalysis.py
+    # NaN, inf or -inf, checked chunk by chunk without a boolean copy of df
     def numpy_check_not_finite(self, df: any) -> bool:
-        try:
-            is_inf = np.isinf(df)
-            try:
-                # need to extract values from pandas.Dataframes first
-                result = True in is_inf.values
-                return result
-            except AttributeError as e:
-                return True in is_inf
-        except TypeError as e:
-            return False
+        return self.non_finites.is_not_finite(df)
 
     # copied as is from https://github.com/sola-st/DyLin/blob/main/src/dylin/analyses/NonFinitesAnalysis.py
     def check_np_issue_found(self, value: any) -> bool:
@@ -13,13 +13,13 @@ class Thread_OverrideRun(Spec):
 
     def __init__(self):
         super().__init__()
-        original_run_method_hash = sha256(getsource(threading.Thread.run).encode()).hexdigest()
+        self.original_run_method_hash = sha256(getsource(threading.Thread.run).encode()).hexdigest()
+        self.run_not_overridden = {}  # key: thread class, value: (its run attribute, verdict)
 
         @self.event_before(call(threading.Thread, 'start'))
         def run(**kw):
             obj = kw['obj']
-            sha = sha256(getsource(obj.run).encode()).hexdigest()
-            if sha == original_run_method_hash:  # method run not overridden
+            if self._run_not_overridden(obj):  # method run not overridden
                 # argument 'target' not passed in constructor
                 if not hasattr(obj, '_target') or getattr(obj, '_target') is None:
                     return {'verdict': VIOLATION, 
@@ -27,6 +27,25 @@ class Thread_OverrideRun(Spec):
                             'filename': kw['call_file_name'],
                             'lineno': kw['call_line_num']}
 
+    def _run_not_overridden(self, obj):
+        # a run assigned on the thread itself replaces the one of its class, it is checked every time
+        if 'run' in getattr(obj, '__dict__', ()):
+            return self._is_original_run(obj.run)
+
+        # getsource reads the source file, so the verdict is kept per class until its run method is replaced
+        cls = type(obj)
+        run = getattr(cls, 'run', None)
+        cached = self.run_not_overridden.get(cls)
+        if cached is not None and cached[0] is run:
+            return cached[1]
+
+        verdict = self._is_original_run(run)
+        self.run_not_overridden[cls] = (run, verdict)
+        return verdict
+
+    def _is_original_run(self, run):
+        return run is threading.Thread.run or sha256(getsource(run).encode()).hexdigest() == self.original_run_method_hash
+
     def match(self, call_file_name, call_line_num):
         print(
             f'Spec - {self.__class__.__name__}: Thread run method not overridden or argument target not passed in constructor. file {call_file_name}, line {call_line_num}.')
@@ -32,6 +32,14 @@ DEVELOPER_ID=$(echo "$TESTING_REPO_URL" | sed -E 's|https://github.com/([^/]+)/.
 # Create combined name with developer ID and repo name
 CLONE_DIR="${DEVELOPER_ID}-${TESTING_REPO_NAME}_DynaPyt_8"
 
+# Run the checkers as one analysis through CheckerDispatcher if DYNAPYT_DISPATCHER=1
+if [ "${DYNAPYT_DISPATCHER:-0}" = "1" ]; then
+    ANALYSES_FILE="dynapyt_dispatcher_analyses.txt"
+    CLONE_DIR="${CLONE_DIR}_dispatcher"
+else
+    ANALYSES_FILE="dynapyt_analyses.txt"
+fi
+
 # Create the directory if it does not exist
 mkdir -p "$CLONE_DIR"
 
@@ -123,7 +131,7 @@ export DYNAPYT_SESSION_ID=$(uuidgen)
 echo "DynaPyt Session ID: $DYNAPYT_SESSION_ID"
 
 # Copy the analyses file to temp directory with session ID
-cp "$PWD/../Specs_libs/dynapyt_analyses.txt" "$TMPDIR/dynapyt_analyses-$DYNAPYT_SESSION_ID.txt"
+cp "$PWD/../Specs_libs/$ANALYSES_FILE" "$TMPDIR/dynapyt_analyses-$DYNAPYT_SESSION_ID.txt"
 
 # Display contents of the copied file
 cat "$TMPDIR/dynapyt_analyses-$DYNAPYT_SESSION_ID.txt"
@@ -189,8 +197,8 @@ echo "Test Start Time: ${TEST_START_TIME}" >> $RESULTS_FILE
 echo "Test End Time: ${TEST_END_TIME}" >> $RESULTS_FILE
 echo "Test Time: ${TEST_TIME}s" >> $RESULTS_FILE
 
-# Copy all the txt files in the TESTING_REPO_NAME directory that end with _statistics.txt to the $CLONE_DIR directory
-find "${TESTING_REPO_NAME}" -name "*_statistics.txt" -exec cp {} $CLONE_DIR/ \;
+# Copy the DynaPyt statistics files (one DynaPyt-{pid}.jsonl per process) in the TESTING_REPO_NAME directory to the $CLONE_DIR directory
+find "${TESTING_REPO_NAME}" -name "DynaPyt-*.jsonl" -exec cp {} $CLONE_DIR/ \;
 
 # Copy the ${TESTING_REPO_NAME}_Output.txt file to the $CLONE_DIR directory
 cp "${TESTING_REPO_NAME}/${TESTING_REPO_NAME}_Output.txt" $CLONE_DIR/
@@ -1,21 +1,13 @@
-import os
-import subprocess
+from log_reader import find_last_line
+
+
+def is_result_line(line):
+    return 'in' in line and "passed" in line
 
 def get_result_line(filename):
-    # get last line from file
+    # search the last 500 lines of the file for the pytest summary, starting from the last one
     try:
-        last_line = subprocess.check_output(
-            ['tail', '-1', filename]).decode('utf-8').strip()
-        # if the last line is not the one we want, get the last 100 lines and search
-        if 'in' not in last_line or "passed" not in last_line:
-            last_lines = subprocess.check_output(
-                ['tail', '-500', filename]).decode('utf-8').strip().split('\n')
-            for line in reversed(last_lines):
-                if 'in' in line and "passed" in line:
-                    last_line = line
-                    return last_line
-        else:
-            return last_line
+        return find_last_line(filename, is_result_line, max_lines=500)
     except Exception as e:
         print('Error: ', e)
         return None
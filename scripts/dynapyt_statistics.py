@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import argparse
+
+# Name of the statistics files written by the DynaPyt analyses (StatisticsSink), one per process.
+STATISTICS_PREFIX = 'DynaPyt-'
+STATISTICS_SUFFIX = '.jsonl'
+
+
+def find_statistics_files(path):
+    # a file is taken as is, a folder is searched recursively
+    if os.path.isfile(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.startswith(STATISTICS_PREFIX) and name.endswith(STATISTICS_SUFFIX):
+                yield os.path.join(root, name)
+
+
+def read_records(filename):
+    # example of a line (one per analysis)
+    '''
+    {"spec": "StringConcatAnalysis", "monitors": 0, "events": {"string_concat": 3},
+     "violations": {"<violation message>": {"count": 3}}, "statistics": {...}}
+    '''
+    with open(filename, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def merge_statistics(filenames):
+    """Merge the records of the statistics files, of any number of processes and projects,
+    into the dicts of PyMOP's -full.json and -violations.json:
+        full = {spec: {"monitors": count, "events": {event: count}}}
+        violations = {spec: {message: {"count": count}}}
+    """
+    full = {}
+    violations = {}
+    for filename in filenames:
+        for record in read_records(filename):
+            spec = record['spec']
+
+            spec_full = full.setdefault(spec, {'monitors': 0, 'events': {}})
+            spec_full['monitors'] += record['monitors']
+            events = spec_full['events']
+            for event, count in record['events'].items():
+                events[event] = events.get(event, 0) + count
+
+            spec_violations = violations.setdefault(spec, {})
+            for message, violation in record['violations'].items():
+                merged = spec_violations.setdefault(message, {'count': 0})
+                merged['count'] += violation['count']
+    return full, violations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Merge the DynaPyt statistics files into <prefix>-full.json and <prefix>-violations.json')
+    parser.add_argument('paths', nargs='+', help='statistics files, or folders to search for them (e.g. one per project)')
+    parser.add_argument('-o', '--output-prefix', default='DynaPyt',
+                        help='prefix of the output files, may include a folder (default: DynaPyt)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    filenames = [filename for path in args.paths for filename in find_statistics_files(path)]
+    if not filenames:
+        print('No statistics files found.')
+        sys.exit(1)
+
+    full, violations = merge_statistics(filenames)
+
+    with open(f'{args.output_prefix}-full.json', 'w') as f:
+        json.dump(full, f, indent=2)
+    with open(f'{args.output_prefix}-violations.json', 'w') as f:
+        json.dump(violations, f, indent=2)
+
+    print(f'merged {len(filenames)} statistics files of {len(full)} specs into '
+          f'{args.output_prefix}-full.json and {args.output_prefix}-violations.json')
+
+
+if __name__ == '__main__':
+    main()
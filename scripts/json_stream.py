@@ -0,0 +1,147 @@
+import re
+import json
+from json.decoder import scanstring
+
+# Size of the chunks read from the file by JsonStream.
+CHUNK_SIZE = 256 * 1024
+SKIP_WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_START = '-0123456789'
+NUMBER_END = re.compile(r'[,\]}\s]')
+
+
+class JsonStream:
+    """Incremental reader for JSON files made of nested objects.
+
+    Only the part of the file being decoded is kept in memory: objects are walked
+    key by key with items(), and only the values asked for with value() are decoded
+    (with the C decoder of the json module). This is how huge *-violations.json
+    files are summed up without building the whole tree.
+
+        stream = JsonStream(f)
+        for spec in stream.items():
+            for violation in stream.items():
+                count = stream.value()['count']
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.file = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        # True while the value of the key yielded last by items() was not consumed
+        self.pending_value = False
+
+    def _fill(self):
+        # read one more chunk, dropping what was already consumed; False at the end of the file
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self):
+        # next non-whitespace character, without consuming it ('' at the end of the file)
+        while True:
+            self.position = SKIP_WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f'Expected {char!r} but found {found!r} in JSON stream')
+        self.position += 1
+
+    def _decode(self, decode):
+        # run decode(buffer, position) -> (value, end), reading more of the file until the token is complete
+        while True:
+            try:
+                value, end = decode(self.buffer, self.position)
+            except (json.JSONDecodeError, ValueError, IndexError):
+                if self._fill():
+                    continue
+                raise
+            self.position = end
+            return value
+
+    def value(self):
+        """Decode and return the next value."""
+        self.pending_value = False
+        if self._peek() in NUMBER_START:
+            # a number could go on in the next chunk, make sure its end was read
+            while not NUMBER_END.search(self.buffer, self.position) and self._fill():
+                pass
+        return self._decode(self.decoder.raw_decode)
+
+    def skip(self):
+        """Skip the next value."""
+        if self._peek() in '{[':
+            self._skip_container()
+        else:
+            self.value()
+
+    def _skip_container(self):
+        self.pending_value = False
+        opening = self._peek()
+        if opening == '{':
+            for _ in self.items():
+                pass
+        else:
+            for _ in self.array_items():
+                pass
+
+    def items(self):
+        """Yield the keys of the next object; the caller reads each value with value(), items() or skip().
+
+        Values the caller did not read are skipped.
+        """
+        self.pending_value = False
+        self._expect('{')
+        if self._peek() == '}':
+            self.position += 1
+            return
+
+        while True:
+            self._expect('"')
+            key = self._decode(scanstring)
+            self._expect(':')
+            self.pending_value = True
+            yield key
+            if self.pending_value:
+                self.skip()
+
+            separator = self._peek()
+            self.position += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f'Expected \',\' or \'}}\' but found {separator!r} in JSON stream')
+
+    def array_items(self):
+        """Yield once per element of the next array; the caller reads each element like in items()."""
+        self.pending_value = False
+        self._expect('[')
+        if self._peek() == ']':
+            self.position += 1
+            return
+
+        while True:
+            self.pending_value = True
+            yield
+            if self.pending_value:
+                self.skip()
+
+            separator = self._peek()
+            self.position += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f'Expected \',\' or \']\' but found {separator!r} in JSON stream')
@@ -0,0 +1,217 @@
+import os
+import re
+import mmap
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import List, Optional, Union
+
+# Size of the blocks read from the end of the file by reverse_lines.
+BLOCK_SIZE = 64 * 1024
+
+
+def decode_line(line: bytes) -> str:
+    """Decode a raw line the same way the pytest output was written."""
+    return line.rstrip(b'\r').decode('utf-8', errors='replace')
+
+
+def reverse_lines(filename: str, block_size: int = BLOCK_SIZE):
+    """Yield the lines of a file from the last one to the first one.
+
+    The file is read backwards in blocks of block_size bytes, so getting the last
+    lines of a multi-GB log costs a couple of reads instead of the whole file.
+    """
+    with open(filename, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b''
+        first_block = True
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+
+            if first_block:
+                # a trailing newline does not start a new (empty) line
+                if block.endswith(b'\n'):
+                    block = block[:-1]
+                first_block = False
+
+            lines = block.split(b'\n')
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                yield decode_line(line)
+
+        if not first_block:
+            yield decode_line(remainder)
+
+
+def find_last_line(filename: str, predicate, max_lines: int = 500):
+    """Return the last line among the last max_lines lines matching predicate, or None."""
+    for line in islice(reverse_lines(filename), max_lines):
+        if predicate(line):
+            return line
+    return None
+
+
+def _context_start(data, line_start: int, num_lines: int) -> int:
+    # offset of the line num_lines lines above the line starting at line_start
+    start = line_start
+    for _ in range(num_lines):
+        if start == 0:
+            break
+        start = data.rfind(b'\n', 0, start - 1) + 1
+    return start
+
+
+def _context_end(data, line_end: int, num_lines: int) -> int:
+    # offset right after the line num_lines lines below the line ending at line_end
+    end = line_end
+    for _ in range(num_lines):
+        if end >= len(data):
+            break
+        next_newline = data.find(b'\n', end + 1)
+        end = len(data) if next_newline == -1 else next_newline
+    return end
+
+
+def _count_newlines(data, start: int, end: int, limit: int) -> int:
+    # number of newlines in data[start:end], counting stops at limit
+    count = 0
+    position = data.find(b'\n', start, end)
+    while position != -1 and count < limit:
+        count += 1
+        position = data.find(b'\n', position + 1, end)
+    return count
+
+
+def _add_context_range(ranges, data, line_start: int, line_end: int, before: int, after: int):
+    # add the context window of a matching line, merging it with the previous one when they touch
+    start = _context_start(data, line_start, before)
+    end = _context_end(data, line_end, after)
+
+    if ranges and start <= ranges[-1][1] + 1:
+        ranges[-1][1] = max(ranges[-1][1], end)
+    else:
+        ranges.append([start, end])
+
+
+def _context_groups(data, ranges):
+    return [
+        [decode_line(line) for line in data[start:end].split(b'\n')]
+        for start, end in ranges
+    ]
+
+
+def convert_to_bytes(value, unit):
+    units = {
+        'B': 1,
+        'KB': 1024,
+        'MB': 1024 ** 2,
+        'GB': 1024 ** 3,
+        'TB': 1024 ** 4,
+        'KiB': 1024,
+        'MiB': 1024 ** 2,
+        'GiB': 1024 ** 3,
+        'TiB': 1024 ** 4,
+    }
+    return value * units[unit]
+
+
+@dataclass
+class LogScanResult:
+    """Everything parse_reports needs from a <ALGO>-pytest-output.txt file."""
+    memory_bytes: float = 0
+    pymop_ast_time: Union[float, str] = 0
+    result_line: Optional[str] = None
+    problem_groups: List[List[str]] = field(default_factory=list)
+
+    @property
+    def problem_lines(self):
+        """The problem groups flattened and separated by '--' like grep does, or None."""
+        lines = []
+        for group in self.problem_groups:
+            if lines:
+                lines.append('--')
+            lines.extend(group)
+        return lines or None
+
+
+class LogScanner:
+    """Extract the memory, the AST time, the pytest summary and the crashes of a log in one read.
+
+    All the patterns are combined in a single regex that runs over the memory
+    mapped file, so each file is read exactly once and the process memory does
+    not grow with the size of the log.
+    """
+
+    AST_TIME_MARKER = 'Pythonmop AST after instrumentation time: '
+    PATTERN = re.compile(
+        rb'(?P<memory>Total memory allocated: (?P<value>\d+\.?\d*)(?P<unit>[a-zA-Z]+))'
+        rb'|(?P<ast>' + re.escape(AST_TIME_MARKER.encode()) + rb')'
+        rb'|(?P<problem>(?i:fatal|segmentation fault|core dump))'
+        rb'|(?P<summary>\b(?:passed|errors|error)\b)'
+    )
+
+    def __init__(self, summary_predicate=None, summary_window: int = 500, before: int = 5, after: int = 10):
+        self.summary_predicate = summary_predicate or (lambda line: True)
+        self.summary_window = summary_window
+        self.before = before
+        self.after = after
+
+    def scan(self, filename: str) -> LogScanResult:
+        result = LogScanResult()
+
+        if os.path.getsize(filename) == 0:
+            return result
+
+        with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            ranges = []
+            # start of the last line that matched each kind of pattern, each line is counted once per kind
+            last_line_start = {}
+            summary_line_end = None
+
+            for match in self.PATTERN.finditer(data):
+                kind = match.lastgroup
+                line_start = data.rfind(b'\n', 0, match.start()) + 1
+                if last_line_start.get(kind) == line_start:
+                    continue
+                last_line_start[kind] = line_start
+
+                line_end = data.find(b'\n', match.end())
+                if line_end == -1:
+                    line_end = size
+
+                if kind == 'memory':
+                    result.memory_bytes += convert_to_bytes(float(match.group('value')), match.group('unit').decode())
+                elif kind == 'ast':
+                    # the first report in the file wins
+                    if 'ast_time' not in last_line_start:
+                        last_line_start['ast_time'] = line_start
+                        result.pymop_ast_time = self._parse_ast_time(decode_line(data[line_start:line_end]))
+                elif kind == 'problem':
+                    _add_context_range(ranges, data, line_start, line_end, self.before, self.after)
+                else:
+                    line = decode_line(data[line_start:line_end])
+                    if self.summary_predicate(line):
+                        result.result_line = line
+                        summary_line_end = line_end
+
+            result.problem_groups = _context_groups(data, ranges)
+
+            # like tail, the summary only counts if it is within the last summary_window lines
+            if summary_line_end is not None:
+                content_end = size - 1 if data[size - 1:] == b'\n' else size
+                if _count_newlines(data, summary_line_end, content_end, self.summary_window) >= self.summary_window:
+                    result.result_line = None
+
+        return result
+
+    @staticmethod
+    def _parse_ast_time(line):
+        pymop_ast_time = line.split(' ')[-2].strip()
+        try:
+            return float(pymop_ast_time)
+        except ValueError:
+            return pymop_ast_time
@@ -0,0 +1,244 @@
+import os
+import csv
+import sys
+import math
+import random
+import argparse
+import statistics
+import multiprocessing
+
+from results_store import RESULTS_DB, ResultsStore
+
+csv.field_size_limit(sys.maxsize)
+
+BASELINE = 'ORIGINAL'
+ALGORITHMS = ['A', 'B', 'C', 'C+', 'D']
+RESAMPLES = 1000
+CONFIDENCE = 0.95
+# groups with fewer projects than this are not worth a line in the summary
+MIN_PROJECTS = 2
+
+PROJECT_FIELDNAMES = ['project', 'algorithm', 'original_test_duration', 'test_duration', 'overhead']
+SUMMARY_FIELDNAMES = [
+    'algorithm', 'spec', 'projects', 'geometric_mean', 'ci_low', 'ci_high',
+    'median', 'p90', 'p95', 'min', 'max',
+]
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_spec_events(events):
+    # the events column of results.csv: spec=event=count<>spec=event=count<>...
+    specs = set()
+    for item in (events or '').split('<>'):
+        parts = item.rstrip('<').split('=')
+        if len(parts) == 3 and to_float(parts[2]):
+            specs.add(parts[0])
+    return specs
+
+
+def read_sanity_checked_runs_from_store(file_name):
+    """Return {project: {algorithm: test_duration}} and {(project, algorithm): specs} from the results store."""
+    durations = {}
+    specs = {}
+    with ResultsStore(file_name) as store:
+        for row in store.query('SELECT project, algorithm, test_duration FROM sanity_check'):
+            durations.setdefault(row['project'], {})[row['algorithm']] = to_float(row['test_duration'])
+
+        # the specs that saw at least one event in a run
+        for row in store.query(
+            'SELECT e.project, e.algorithm, e.spec FROM events e '
+            'JOIN sanity_check s ON s.project = e.project AND s.algorithm = e.algorithm '
+            'GROUP BY e.project, e.algorithm, e.spec HAVING SUM(e.count) > 0'
+        ):
+            specs.setdefault((row['project'], row['algorithm']), set()).add(row['spec'])
+    return durations, specs
+
+
+def read_sanity_checked_runs_from_csv(file_name):
+    """Same as read_sanity_checked_runs_from_store, from sanity-check-results.csv."""
+    durations = {}
+    specs = {}
+    with open(file_name) as file:
+        for row in csv.DictReader(file):
+            durations.setdefault(row['project'], {})[row['algorithm']] = to_float(row['test_duration'])
+            run_specs = parse_spec_events(row.get('events'))
+            if run_specs:
+                specs[(row['project'], row['algorithm'])] = run_specs
+    return durations, specs
+
+
+def compute_overheads(durations):
+    """Return {algorithm: (projects, overheads)}, the overhead being test_duration / ORIGINAL test_duration.
+
+    Projects without a positive duration for ORIGINAL or for the algorithm are left out.
+    """
+    overheads = {}
+    for project, algorithm_durations in durations.items():
+        baseline = algorithm_durations.get(BASELINE)
+        if not baseline or baseline <= 0:
+            continue
+        for algorithm, duration in algorithm_durations.items():
+            if algorithm == BASELINE or not duration or duration <= 0:
+                continue
+            projects, ratios = overheads.setdefault(algorithm, ([], []))
+            projects.append(project)
+            ratios.append(duration / baseline)
+    return overheads
+
+
+def percentile(sorted_values, fraction):
+    # linear interpolation between the closest ranks
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def bootstrap_geometric_mean(logs, resamples, confidence, rng):
+    """Percentile bootstrap confidence interval of the geometric mean, given the logs of the values."""
+    n = len(logs)
+    means = sorted(sum(rng.choices(logs, k=n)) / n for _ in range(resamples))
+    alpha = (1 - confidence) / 2
+    return math.exp(percentile(means, alpha)), math.exp(percentile(means, 1 - alpha))
+
+
+def summarize(ratios, resamples, confidence, seed):
+    logs = [math.log(ratio) for ratio in ratios]
+    ratios = sorted(ratios)
+    ci_low, ci_high = bootstrap_geometric_mean(logs, resamples, confidence, random.Random(seed))
+    return {
+        'projects': len(ratios),
+        'geometric_mean': math.exp(statistics.fmean(logs)),
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'median': percentile(ratios, 0.5),
+        'p90': percentile(ratios, 0.9),
+        'p95': percentile(ratios, 0.95),
+        'min': ratios[0],
+        'max': ratios[-1],
+    }
+
+
+def summarize_task(task):
+    # task is (algorithm, spec, ratios, resamples, confidence, seed)
+    algorithm, spec, ratios, resamples, confidence, seed = task
+    # every group gets its own seed so the results do not depend on the number of workers
+    return {'algorithm': algorithm, 'spec': spec, **summarize(ratios, resamples, confidence, f'{seed}-{algorithm}-{spec}')}
+
+
+def iterate_summaries(tasks, jobs):
+    if jobs <= 1:
+        yield from map(summarize_task, tasks)
+        return
+
+    with multiprocessing.Pool(processes=jobs) as pool:
+        yield from pool.imap(summarize_task, tasks, chunksize=1)
+
+
+def group_by_spec(algorithm, projects, ratios, specs):
+    # {spec: overheads of the projects where the spec saw events with this algorithm}
+    groups = {}
+    for project, ratio in zip(projects, ratios):
+        for spec in specs.get((project, algorithm), ()):
+            groups.setdefault(spec, []).append(ratio)
+    return groups
+
+
+def sort_algorithms(algorithms):
+    order = {algorithm: index for index, algorithm in enumerate(ALGORITHMS)}
+    return sorted(algorithms, key=lambda algorithm: (order.get(algorithm, len(order)), algorithm))
+
+
+def analyze(durations, specs, resamples=RESAMPLES, confidence=CONFIDENCE, seed=0, jobs=1):
+    """Return the per project overheads and the summary lines (per algorithm, then per algorithm and spec)."""
+    overheads = compute_overheads(durations)
+
+    project_lines = []
+    tasks = []
+    for algorithm in sort_algorithms(overheads):
+        projects, ratios = overheads[algorithm]
+        for project, ratio in zip(projects, ratios):
+            project_lines.append({
+                'project': project,
+                'algorithm': algorithm,
+                'original_test_duration': durations[project][BASELINE],
+                'test_duration': durations[project][algorithm],
+                'overhead': round(ratio, 4),
+            })
+
+        if len(ratios) >= MIN_PROJECTS:
+            tasks.append((algorithm, '', ratios, resamples, confidence, seed))
+
+        spec_groups = group_by_spec(algorithm, projects, ratios, specs)
+        for spec in sorted(spec_groups):
+            if len(spec_groups[spec]) >= MIN_PROJECTS:
+                tasks.append((algorithm, spec, spec_groups[spec], resamples, confidence, seed))
+
+    return project_lines, list(iterate_summaries(tasks, jobs))
+
+
+def save_csv(file_name, fieldnames, lines):
+    with open(file_name, mode='w') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for line in lines:
+            writer.writerow({
+                key: round(value, 4) if isinstance(value, float) else value
+                for key, value in line.items()
+            })
+
+
+def print_summary(summary_lines, confidence):
+    print(f'{"algorithm":<10} {"projects":>8} {"geo mean":>9} {f"{confidence:.0%} CI":>19} {"median":>8} {"p90":>8} {"p95":>8}')
+    for line in summary_lines:
+        if line['spec']:
+            continue
+        ci = f'[{line["ci_low"]:.3f}, {line["ci_high"]:.3f}]'
+        print(
+            f'{line["algorithm"]:<10} {line["projects"]:>8} {line["geometric_mean"]:>9.3f} {ci:>19} '
+            f'{line["median"]:>8.3f} {line["p90"]:>8.3f} {line["p95"]:>8.3f}'
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Compute the overhead of each algorithm against ORIGINAL over the sanity checked projects.'
+    )
+    parser.add_argument('--db', default=RESULTS_DB,
+                        help=f'Results store written by parse_reports.py and sanity_check.py (default: {RESULTS_DB}).')
+    parser.add_argument('--csv', default='sanity-check-results.csv',
+                        help='Sanity checked results, used when there is no results store (default: sanity-check-results.csv).')
+    parser.add_argument('--resamples', type=int, default=RESAMPLES,
+                        help=f'Number of bootstrap resamples (default: {RESAMPLES}).')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE,
+                        help=f'Confidence level of the intervals (default: {CONFIDENCE}).')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the bootstrap (default: 0).')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes for the bootstrap (default: number of cores, 1 to run serially).')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if os.path.isfile(args.db):
+        durations, specs = read_sanity_checked_runs_from_store(args.db)
+    else:
+        durations, specs = read_sanity_checked_runs_from_csv(args.csv)
+
+    project_lines, summary_lines = analyze(durations, specs, args.resamples, args.confidence, args.seed, args.jobs)
+
+    save_csv('overhead-results.csv', PROJECT_FIELDNAMES, project_lines)
+    save_csv('overhead-summary.csv', SUMMARY_FIELDNAMES, summary_lines)
+    print_summary(summary_lines, args.confidence)
+    print('saved overhead-results.csv and overhead-summary.csv')
+
+
+if __name__ == '__main__':
+    main()
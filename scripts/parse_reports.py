@@ -1,56 +1,42 @@
 import os
+import io
+import sys
 import json
-import subprocess
+import hashlib
+import sqlite3
+import argparse
+import itertools
+import contextlib
+import multiprocessing
 from collections import OrderedDict
-from collections import Counter
 import re
 import csv
 
+from log_reader import LogScanner
+from json_stream import JsonStream
+from results_store import RESULTS_DB, RESULT_FIELDNAMES, ResultsStore
+
 SQL_QUERY_MEM = 'SELECT t.RUN_DESCRIPTION, AVG(m.MEM_USAGE) AS average_memory_usage FROM TEST_METRICS m JOIN TEST_SESSIONS t ON m.SESSION_H = t.SESSION_H GROUP BY t.SESSION_H;'
 SQL_QUERY_TIME2 = 'SELECT t.RUN_DESCRIPTION, SUM(m.USER_TIME) AS total_user_time FROM TEST_METRICS m JOIN TEST_SESSIONS t ON m.SESSION_H = t.SESSION_H GROUP BY t.SESSION_H;'
-problems = {}
 NUM_ALGORITHMS = 6
-REGEX_MEMORY_FILE = re.compile(r"Total memory allocated: (\d+\.?\d*)([a-zA-Z]+)")
-
-def convert_to_bytes(value, unit):
-    units = {
-        'B': 1,
-        'KB': 1024,
-        'MB': 1024 ** 2,
-        'GB': 1024 ** 3,
-        'TB': 1024 ** 4,
-        'KiB': 1024,
-        'MiB': 1024 ** 2,
-        'GiB': 1024 ** 3,
-        'TiB': 1024 ** 4,
-    }
-    return value * units[unit]
-
-
-def process_memory_file(file_path):
-    total_memory_bytes = 0
-    regex = REGEX_MEMORY_FILE
-
-    with open(file_path, 'r') as file:
-        for line in file:
-            match = regex.search(line)
-            if match:
-                value = float(match.group(1))
-                unit = match.group(2)
+ALGORITHMS = ["ORIGINAL", "A", "B", "C", "C+", "D"]
+REGEX_RESULT_LINE = re.compile(r'\b(passed|errors|error)\b')
 
-                # convert to bytes
-                total_memory_bytes += convert_to_bytes(value, unit)
+# Files a parsed project depends on. A project is parsed again only when one of them changed.
+FINGERPRINTED_FILES = [
+    f'{algorithm}{suffix}'
+    for algorithm in ALGORITHMS
+    for suffix in ['-pytest-output.txt', '-full.json', '-violations.json', '-time.json']
+] + ['logs_link.txt']
+HASH_BLOCK_SIZE = 1024 * 1024
 
-    return total_memory_bytes
 
-
-def get_time_from_json(projectname, algorithm):
-    json_filename = f'{algorithm}-time.json'
-    output_filename = f'{algorithm}-pytest-output.txt'
+def get_time_from_json(problems, project_dir, projectname, algorithm, log_scan):
+    json_filename = os.path.join(project_dir, f'{algorithm}-time.json')
 
     # check json filename
     if not os.path.isfile(json_filename):
-        add_problem(projectname, algorithm, "json time not found")
+        add_problem(problems, projectname, algorithm, "json time not found")
         return None
 
     # read json file
@@ -85,36 +71,22 @@ def get_time_from_json(projectname, algorithm):
     except:
         create_monitor_end_time = 0
 
-    if not os.path.isfile(output_filename):
-        add_problem(projectname, algorithm, "output file not found")
+    if log_scan is None:
+        add_problem(problems, projectname, algorithm, "output file not found")
         return None
-    
-    pymop_ast_time = 0
-    with open(output_filename, 'r') as f:
-        for line in reversed(f.readlines()):
-            if "Pythonmop AST after instrumentation time: " in line:
-                pymop_ast_time = line.split(' ')[-2].strip()
-                try:
-                    pymop_ast_time = float(pymop_ast_time)
-                except ValueError:
-                    pass
+
+    # already extracted from the output file by the LogScanner
+    pymop_ast_time = log_scan.pymop_ast_time
 
     return start_time, end_time, instrumentation_end_time, create_monitor_end_time, pymop_ast_time
 
 
-def get_monitors_and_events_from_json(projectname, algorithm):
-    filename = f'{algorithm}-full.json'
+def get_monitors_and_events_from_json(problems, project_dir, projectname, algorithm):
+    filename = os.path.join(project_dir, f'{algorithm}-full.json')
     # check filename
     if not os.path.isfile(filename):
-        add_problem(projectname, algorithm, "json full not found")
+        add_problem(problems, projectname, algorithm, "json full not found")
         return None
-    # read json file
-    with open(filename, 'r') as f:
-        try:
-            json_data = json.load(f)
-        except Exception as e:
-            add_problem(projectname, algorithm, f"Error loading json file. Original error: {e}")
-            return None
 
     # example of json
     '''
@@ -131,110 +103,112 @@ def get_monitors_and_events_from_json(projectname, algorithm):
     return_str_events = ""
     total_monitors = 0
     total_events = 0
+    spec_monitors = {}
+    spec_events = {}
 
-    for spec in json_data.keys():
-        num_monitors = json_data[spec]["monitors"]
-        toal_events = sum(json_data[spec]["events"].values())
-        return_str_monitors += f'{spec}={num_monitors}<>'
-        for event in json_data[spec]["events"].keys():
-            return_str_events += f'{spec}={event}={json_data[spec]["events"][event]}<>'
-        total_monitors += num_monitors
-        total_events += toal_events
-
-    return return_str_monitors[:-1], return_str_events[:-1], total_monitors, total_events
+    # stream the json file spec by spec instead of loading it
+    with open(filename, 'r') as f:
+        try:
+            stream = JsonStream(f)
+            for spec in stream.items():
+                num_monitors = None
+                events = None
+                for key in stream.items():
+                    if key == "monitors":
+                        num_monitors = stream.value()
+                    elif key == "events":
+                        events = {event: stream.value() for event in stream.items()}
+                if num_monitors is None or events is None:
+                    raise KeyError("monitors" if num_monitors is None else "events")
+
+                toal_events = sum(events.values())
+                return_str_monitors += f'{spec}={num_monitors}<>'
+                for event, count in events.items():
+                    return_str_events += f'{spec}={event}={count}<>'
+                total_monitors += num_monitors
+                total_events += toal_events
+                spec_monitors[spec] = num_monitors
+                spec_events[spec] = events
+        except Exception as e:
+            add_problem(problems, projectname, algorithm, f"Error loading json file. Original error: {e}")
+            return None
 
-    return return_string[:-1], total_violations
+    return return_str_monitors[:-1], return_str_events[:-1], total_monitors, total_events, spec_monitors, spec_events
 
 
-def get_num_violations_from_json(projectname, algorithm):
-    filename = f'{algorithm}-violations.json'
+def get_num_violations_from_json(problems, project_dir, projectname, algorithm):
+    filename = os.path.join(project_dir, f'{algorithm}-violations.json')
     # check filename
     if not os.path.isfile(filename):
-        add_problem(projectname, algorithm, "json violations not found")
+        add_problem(problems, projectname, algorithm, "json violations not found")
         return None
-    # read json file
-    with open(filename, 'r') as f:
-        json_data = json.load(f)
 
+    # example of json
+    '''
+    {
+    "Thread_StartOnce": {
+        "<violation message>": {
+        "count": 2,
+        "test": "..."
+        }
+    }
+    }
+    '''
     return_spec_string = ""
     total_violations = 0
     unique_violations_count = ""
     unique_violations_summary = {}
     unique_violations_test = {}
+    violation_counts = {}
 
-    for spec in json_data.keys():
-        # Count unique elements and their occurrences
-        size = 0
-        violations = []
-        violations_test = {}
-
-        # Go through each violation in the spec
-        for item in json_data[spec]:
-            violations += [item]
-            if violations_test.get(item) is None:
-                violations_test[item] = set()
-            # violations_test[item].add(item['test'])
+    # stream the json file violation by violation: only the counts are kept, not the whole tree
+    with open(filename, 'r') as f:
+        stream = JsonStream(f)
+        for spec in stream.items():
+            counts = {}
 
-            # Add the count of the violation to the size
-            size += json_data[spec][item]['count']
+            # Go through each violation in the spec
+            for item in stream.items():
+                counts[item] = stream.value()['count']
 
-        # Add the size to the return string
-        return_spec_string += f'{spec}={size};'
+            # Add the count of the violations to the size
+            size = sum(counts.values())
 
-        # Count the unique violations
-        violations_counter = Counter(violations)
+            # Add the size to the return string
+            return_spec_string += f'{spec}={size};'
 
-        # Store the unique violation counts and summary in the dictionaries
-        unique_violations_summary[spec] = dict(violations_counter)
-        unique_violations_test[spec] = dict(violations_test)
-        unique_violations_count += f'{spec}={len(dict(violations_counter))};'
+            # Store the unique violation counts and summary in the dictionaries
+            # (the violations of a spec are the keys of a json object, so each one is unique)
+            unique_violations_summary[spec] = dict.fromkeys(counts, 1)
+            unique_violations_test[spec] = {item: set() for item in counts}
+            unique_violations_count += f'{spec}={len(counts)};'
+            violation_counts[spec] = counts
 
-        # Add the size to the total violations
-        total_violations += size
+            # Add the size to the total violations
+            total_violations += size
 
     return (return_spec_string[:-1], total_violations, unique_violations_count, unique_violations_summary,
-            unique_violations_test)
+            unique_violations_test, violation_counts)
 
-def get_result_line(filename):
-    # get last line from file
-    try:
-        last_line = subprocess.check_output(
-            ['tail', '-1', filename]).decode('utf-8').strip()
-        # if the last line is not the one we want, get the last 100 lines and search
-        if 'in' in last_line and re.search(r'\b(passed|errors|error)\b', last_line) and "WARNING" not in last_line:
-            return last_line
-        else:
-            last_lines = subprocess.check_output(
-                ['tail', '-500', filename]).decode('utf-8').strip().split('\n')
-            for line in reversed(last_lines):
-                if 'in' in line and re.search(r'\b(passed|errors|error)\b', line) and "WARNING" not in line:
-                    last_line = line
-                    return last_line
-            
-    except:
-        return None
+def is_result_line(line):
+    return 'in' in line and REGEX_RESULT_LINE.search(line) and "WARNING" not in line
 
-def find_problems(filename):
-    # look for keywords like fatal, sigmentation fault, core dump within the data in filename and return the line containing the error as well as 5 lines above and 10 after
-    try:
-        lines = subprocess.check_output(
-            ['grep', '-A', '10', '-B', '5', '-i', '-E', 'fatal|segmentation fault|core dump', filename]).decode('utf-8').strip().split('\n')
-        return lines
-    except:
-        return None
 
-def get_results(filename, project, algorithm):
+LOG_SCANNER = LogScanner(summary_predicate=is_result_line, summary_window=500, before=5, after=10)
+
+
+def get_results(problems, filename, log_scan, project, algorithm):
     # check filename
     if not os.path.isfile(filename):
-        add_problem(project, algorithm, "File not found")
+        add_problem(problems, project, algorithm, "File not found")
         raise Exception('File not found', filename)
 
-    last_line = get_result_line(filename)
+    last_line = log_scan.result_line.strip() if log_scan and log_scan.result_line is not None else None
     print('--->last_line->', last_line)
     try:
         time = last_line.split('in ')[1].split('s')[0].strip()
     except Exception as e:
-        add_problem(project, algorithm,f"Error parsing time. last_line={last_line}")
+        add_problem(problems, project, algorithm,f"Error parsing time. last_line={last_line}")
         raise Exception(f'Error parsing time. last_line={last_line}. Original Error: {e}')
 
     line = OrderedDict({
@@ -267,62 +241,65 @@ def get_results(filename, project, algorithm):
     return line
 
 
-def get_memory_from_db(projectname, algorithm):
-    # run sqlite3 db.pymon < test.sql and get the output
+def run_db_query(project_dir, algorithm, query):
+    # run the query on db.pymon_<algorithm> and return the rows
+    db_file = os.path.join(project_dir, f'db.pymon_{algorithm}')
+    if not os.path.isfile(db_file):
+        raise FileNotFoundError(db_file)
+    with contextlib.closing(sqlite3.connect(f'file:{db_file}?mode=ro', uri=True)) as connection:
+        return connection.execute(query).fetchall()
+
+
+def get_memory_from_db(problems, project_dir, projectname, algorithm):
     try:
-        output_lines = subprocess.check_output(
-            ['sqlite3', f'db.pymon_{algorithm}', SQL_QUERY_MEM], stderr=subprocess.DEVNULL).decode('utf-8').strip().split('\n')
+        output_lines = run_db_query(project_dir, algorithm, SQL_QUERY_MEM)
     except Exception as e:
         print('Failed to run SQL query', e)
         print('directory contents:')
-        print(os.listdir())
-        add_problem(projectname, algorithm, f"Error running SQL query.")
+        print(os.listdir(project_dir))
+        add_problem(problems, projectname, algorithm, f"Error running SQL query.")
         return 0.0
 
     algo = f'"ALGO_{algorithm}"'
 
     if len(output_lines) == 0:
-        add_problem(projectname, algorithm, "No data in database")
+        add_problem(problems, projectname, algorithm, "No data in database")
     if len(output_lines) > NUM_ALGORITHMS:
-        add_problem(projectname, algorithm,
+        add_problem(problems, projectname, algorithm,
                     f"Too many lines in database. len={len(output_lines)}")
         return 0.0
 
-    for line in output_lines:
-        if algo in line:
-            average = line.split('|')[1].strip()
+    for run_description, average in output_lines:
+        if algo in str(run_description):
             return round(float(average), 2)
 
 
-def get_time_from_db(projectname, algorithm):
-    # run sqlite3 db.pymon < test.sql and get the output
+def get_time_from_db(problems, project_dir, projectname, algorithm):
     try:
-        output_lines = subprocess.check_output(
-            ['sqlite3', f'db.pymon_{algorithm}', SQL_QUERY_TIME2], stderr=subprocess.DEVNULL).decode('utf-8').strip().split('\n')
+        output_lines = run_db_query(project_dir, algorithm, SQL_QUERY_TIME2)
     except Exception as e:
         print('Failed to run SQL query', e)
         print('directory contents:')
-        print(os.listdir())
-        add_problem(projectname, algorithm, f"Error running SQL query.")
+        print(os.listdir(project_dir))
+        add_problem(problems, projectname, algorithm, f"Error running SQL query.")
         return 0.0
 
     algo = f'"ALGO_{algorithm}"'
 
     if len(output_lines) == 0:
-        add_problem(projectname, algorithm, "No data in database")
+        add_problem(problems, projectname, algorithm, "No data in database")
         return None
     if len(output_lines) > NUM_ALGORITHMS:
-        add_problem(projectname, algorithm,
+        add_problem(problems, projectname, algorithm,
                     f"Too many lines in database. len={len(output_lines)}")
         return 0.0
 
-    for line in output_lines:
-        if algo in line:
-            time2 = line.split('|')[1].strip()
+    for run_description, time2 in output_lines:
+        if algo in str(run_description):
             return round(float(time2), 2)
 
 
-def compare(results, projectname):
+def compare(problems, results, projectname):
     # Regular expression to remove ANSI escape sequences
     ansi_escape = re.compile(r'\x1b\[([0-9]+)(;[0-9]+)*m')
 
@@ -345,15 +322,14 @@ def compare(results, projectname):
                 if diff != 0:
                     message = f'DIFF: {key} is different from ORIGINAL. diff={diff}'
                     result['comparison_problems'] = f'{message}'
-                    add_problem(projectname, result['algorithm'], message)
+                    add_problem(problems, projectname, result['algorithm'], message)
             else:
                 message = f'Non-numeric or invalid data for comparison. Original: {original_value_clean}, Result: {result_value_clean}'
                 result['comparison_problems'] = f'{message}'
-                add_problem(projectname, result['algorithm'], message)
+                add_problem(problems, projectname, result['algorithm'], message)
 
 
-def add_problem(project, algorithm, message):
-    global problems
+def add_problem(problems, project, algorithm, message):
     if project not in problems:
         problems[project] = {}
     if algorithm not in problems[project]:
@@ -373,26 +349,11 @@ def print_results_csv(lines):
         print(line[:-1])
 
 
-def results_csv_file(lines):
-    if not lines:
-        print('No data to write.')
-        return
-
-    # Find the line with the maximum number of keys (columns)
-    max_columns_line = max(lines, key=lambda line: len(line.keys()))
-
-    with open('results.csv', 'w', newline='', encoding='utf-8') as f:
-        # Use the keys from the line with the most keys as fieldnames
-        writer = csv.DictWriter(f, fieldnames=max_columns_line.keys())
-        writer.writeheader()
-        for line in lines:
-            try:
-                writer.writerow(line)
-                # print('success writing line:', line.keys())
-            except Exception as e:
-                print('could not write line:', line.keys(), str(e))
-
-    print('CSV file created successfully.')
+def write_result_line(writer, line):
+    try:
+        writer.writerow(line)
+    except Exception as e:
+        print('could not write line:', line.keys(), str(e))
 
 
 def print_problems_csv(problems):
@@ -437,155 +398,331 @@ def print_problems_json(problems):
     print(json.dumps(type_problems, indent=2))
 
 
-def main():
-    global problems
-    lines = []
+def parse_project(project_dir, projectname, problems, details):
+    print("directory contents:", os.listdir(project_dir))
 
-    for project in sorted(os.listdir('.')):
-        if os.path.isdir(project) and 'report' not in project:
-            # Remove the trailing slash to get the project name
-            projectname = project.rstrip('/')
-            print("======")
-            print(f'Project: {projectname}')
+    # Iterate through each algorithm
+    results = []
 
-            os.chdir(projectname)
-            print("directory contents:", os.listdir())
+    for algorithm in ALGORITHMS:
+        print(f'Algo: {algorithm}')
+        filename = os.path.join(project_dir, f'{algorithm}-pytest-output.txt')
 
-            # Iterate through each algorithm
-            algos = ["ORIGINAL", "A", "B", "C", "C+", "D"]
-            results = []
+        # read the output file once and get everything needed from it
+        log_scan = None
+        scan_error = None
+        if os.path.isfile(filename):
+            try:
+                log_scan = LOG_SCANNER.scan(filename)
+            except Exception as e:
+                scan_error = e
+
+        line = None
+        try:
+            line = get_results(problems, filename, log_scan, projectname, algorithm)
+        except Exception as e:
+            line = {
+                'project': projectname,
+                'algorithm': algorithm,
+                'execution_problems': f'{e}'
+            }
+
+        more_problems = log_scan.problem_lines if log_scan else None
+        if more_problems:
+            line['execution_problems'] = f'{line["execution_problems"]}\n\n{more_problems}'
+
+        if not 'File not found' in line['execution_problems']:
 
-            for algorithm in algos:
-                print(f'Algo: {algorithm}')
-                filename = f'{algorithm}-pytest-output.txt'
-                line = None
+            # get the memory from the output file
+            if log_scan is not None:
+                total_memory_kb = round(log_scan.memory_bytes / 1024, 2)
+            else:
+                line['execution_problems'] = f'{line["execution_problems"]}\n\nCould not scan the output file. Original error: {scan_error}'
+                total_memory_kb = None
+
+            line['usage_memory'] = total_memory_kb
+
+            # get time from json produced by pymop
+            try:
+                ret_time = get_time_from_json(problems, project_dir, projectname, algorithm, log_scan)
+            except Exception as e:
+                line['execution_problems'] = f'{line["execution_problems"]}\n\nCould not get_time_from_json. Original error: {e}'
+                ret_time = None
+
+            if ret_time is not None:
+                (start_time, end_time, instrumentation_end_time, create_monitor_end_time, pymop_ast_time) = ret_time
                 try:
-                    line = get_results(filename, projectname, algorithm)
+                    line['time_instrumentation'] = instrumentation_end_time - start_time + pymop_ast_time
                 except Exception as e:
-                    line = {
-                        'project': project,
-                        'algorithm': algorithm,
-                        'execution_problems': f'{e}'
-                    }
-
-                more_problems = find_problems(filename)
-                if more_problems:
-                    line['execution_problems'] = f'{line["execution_problems"]}\n\n{more_problems}'
-
-                if not 'File not found' in line['execution_problems']:
-
-                    # get the memory from the output file
-                    try:
-                        total_memory_bytes = process_memory_file(filename)
-                        total_memory_kb = round(total_memory_bytes / 1024, 2)
-                    except Exception as e:
-                        line['execution_problems'] = f'{line["execution_problems"]}\n\nCould not process_memory_file. Original error: {e}'
-                        total_memory_kb = None
-
-                    line['usage_memory'] = total_memory_kb
-
-                    # get time from json produced by pymop
-                    try:
-                        ret_time = get_time_from_json(projectname, algorithm)
-                    except Exception as e:
-                        line['execution_problems'] = f'{line["execution_problems"]}\n\nCould not get_time_from_json. Original error: {e}'
-                        ret_time = None
-
-                    if ret_time is not None:
-                        (start_time, end_time, instrumentation_end_time, create_monitor_end_time, pymop_ast_time) = ret_time
-                        try:
-                            line['time_instrumentation'] = instrumentation_end_time - start_time + pymop_ast_time
-                        except Exception as e:
-                            line['time_instrumentation'] = -1
-                        try:
-                            line['time_create_monitor'] = create_monitor_end_time - instrumentation_end_time
-                        except Exception as e:
-                            line['time_create_monitor'] = -1
-                        try:
-                            line['test_duration'] = end_time - create_monitor_end_time - pymop_ast_time
-                        except Exception as e:
-                            line['test_duration'] = -1
-                        try:
-                            line['end_to_end_time'] = end_time - start_time
-                        except Exception as e:
-                            line['end_to_end_time'] = -1
-
-                    # get time2 from db
-                    # time2 = get_time_from_db(projectname, algorithm)
-                    # line['time2'] = time2
-
-                    # get memory from db
-                    # mem = get_memory_from_db(projectname, algorithm)
-                    # line['memory'] = mem
-
-                    if algorithm != "ORIGINAL":
-
-                        # get violations from json
-                        ret_violation = get_num_violations_from_json(projectname, algorithm)
-
-                        if ret_violation is not None:
-                            (
-                                violations_str,
-                                total_violations,
-                                unique_violations_count,
-                                unique_violations_summary,
-                                unique_violations_test
-                            ) = (
-                                ret_violation[0],
-                                ret_violation[1],
-                                ret_violation[2],
-                                ret_violation[3],
-                                ret_violation[4]
-                            )
-                        
-                            line['total_violations'] = total_violations
-                            line['violations'] = violations_str
-                            line['unique_violations_count'] = unique_violations_count
-                            str_unique_violations_summary = str(unique_violations_summary).replace(",", "<>")
-                            line['unique_violations_summary'] = str_unique_violations_summary
-                            str_unique_violations_test = str(unique_violations_test).replace(",", "<>")
-                            line['unique_violations_test'] = str_unique_violations_test
-
-                        # get monitors and events from json
-                        ret_full = get_monitors_and_events_from_json(projectname, algorithm)
-
-                        if ret_full is not None:
-                            monitors_str, events_str, total_monitors, total_events = ret_full[0], ret_full[1], ret_full[2], ret_full[3]
-
-                            line['monitors'] = monitors_str
-                            line['total_monitors'] = total_monitors
-                            line['events'] = events_str
-                            line['total_events'] = total_events                    
-
-                    # check if log_link.txt exists
-                    if os.path.isfile('logs_link.txt'):
-                        with open('logs_link.txt', 'r') as file:
-                            log_file = file.read()
-
-                            # replace the last part of log_file from _(.+).zip to _{algorithm}.zip
-                            log_file = re.sub(r'_([A-Z]+).zip', f'_{algorithm}.zip', log_file)
-
-                            line['log_file'] = log_file
-
-                    results.append(line)
-            if len(results) == 0:
-                print(f'No results found for {projectname}')
-                os.chdir('..')
-                continue
-            compare(results, project)
-            lines.extend(results)
-
-            os.chdir('..')
+                    line['time_instrumentation'] = -1
+                try:
+                    line['time_create_monitor'] = create_monitor_end_time - instrumentation_end_time
+                except Exception as e:
+                    line['time_create_monitor'] = -1
+                try:
+                    line['test_duration'] = end_time - create_monitor_end_time - pymop_ast_time
+                except Exception as e:
+                    line['test_duration'] = -1
+                try:
+                    line['end_to_end_time'] = end_time - start_time
+                except Exception as e:
+                    line['end_to_end_time'] = -1
+
+            # get time2 from db
+            # time2 = get_time_from_db(problems, project_dir, projectname, algorithm)
+            # line['time2'] = time2
+
+            # get memory from db
+            # mem = get_memory_from_db(problems, project_dir, projectname, algorithm)
+            # line['memory'] = mem
+
+            if algorithm != "ORIGINAL":
+
+                # get violations from json
+                ret_violation = get_num_violations_from_json(problems, project_dir, projectname, algorithm)
+
+                if ret_violation is not None:
+                    (
+                        violations_str,
+                        total_violations,
+                        unique_violations_count,
+                        unique_violations_summary,
+                        unique_violations_test
+                    ) = (
+                        ret_violation[0],
+                        ret_violation[1],
+                        ret_violation[2],
+                        ret_violation[3],
+                        ret_violation[4]
+                    )
+
+                    line['total_violations'] = total_violations
+                    line['violations'] = violations_str
+                    line['unique_violations_count'] = unique_violations_count
+                    str_unique_violations_summary = str(unique_violations_summary).replace(",", "<>")
+                    line['unique_violations_summary'] = str_unique_violations_summary
+                    str_unique_violations_test = str(unique_violations_test).replace(",", "<>")
+                    line['unique_violations_test'] = str_unique_violations_test
+
+                    details.setdefault(algorithm, {})['violations'] = ret_violation[5]
+
+                # get monitors and events from json
+                ret_full = get_monitors_and_events_from_json(problems, project_dir, projectname, algorithm)
+
+                if ret_full is not None:
+                    monitors_str, events_str, total_monitors, total_events = ret_full[0], ret_full[1], ret_full[2], ret_full[3]
+
+                    line['monitors'] = monitors_str
+                    line['total_monitors'] = total_monitors
+                    line['events'] = events_str
+                    line['total_events'] = total_events
+
+                    details.setdefault(algorithm, {})['monitors'] = ret_full[4]
+                    details[algorithm]['events'] = ret_full[5]
+
+            # check if log_link.txt exists
+            logs_link_file = os.path.join(project_dir, 'logs_link.txt')
+            if os.path.isfile(logs_link_file):
+                with open(logs_link_file, 'r') as file:
+                    log_file = file.read()
+
+                    # replace the last part of log_file from _(.+).zip to _{algorithm}.zip
+                    log_file = re.sub(r'_([A-Z]+).zip', f'_{algorithm}.zip', log_file)
+
+                    line['log_file'] = log_file
+
+            results.append(line)
+
+    if len(results) == 0:
+        print(f'No results found for {projectname}')
+        return results
+
+    compare(problems, results, projectname)
+    return results
+
+
+def hash_file(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def stat_project_files(project_dir):
+    # {file: (size, mtime_ns)} of the files of the project that the parsed rows depend on
+    stats = {}
+    for file in FINGERPRINTED_FILES:
+        try:
+            stat = os.stat(os.path.join(project_dir, file))
+        except OSError:
+            continue
+        stats[file] = (stat.st_size, stat.st_mtime_ns)
+    return stats
+
+
+def is_unchanged(stats, cached_fingerprints):
+    # cheap check: same files with the same size and modification time
+    return cached_fingerprints is not None and stats.keys() == cached_fingerprints.keys() and all(
+        stats[file] == cached_fingerprints[file][:2] for file in stats
+    )
+
+
+def fingerprint_project(project_dir, cached_fingerprints=None):
+    """Return {file: (size, mtime_ns, sha256)} for the files of a project.
+
+    Files whose size and modification time did not change since they were cached
+    keep their cached hash, so only new or touched files are read.
+    """
+    cached_fingerprints = cached_fingerprints or {}
+    fingerprints = {}
+    for file, stat in stat_project_files(project_dir).items():
+        cached = cached_fingerprints.get(file)
+        if cached is not None and cached[:2] == stat:
+            fingerprints[file] = cached
+        else:
+            fingerprints[file] = (*stat, hash_file(os.path.join(project_dir, file)))
+    return fingerprints
+
+
+def process_project(project_dir, cached_fingerprints=None):
+    """Parse all the algorithms of one project folder.
+
+    Runs inside a worker process, so nothing is shared with the other projects:
+    the rows, the per-spec details, the problems and the log output of the project
+    are returned together and the parent process writes them out in one piece.
+
+    When the content of the files did not change since cached_fingerprints were
+    taken, the project is not parsed and results is None: the cached rows are used.
+    """
+    # Remove the trailing slash to get the project name
+    projectname = os.path.basename(project_dir.rstrip('/'))
+    problems = {}
+    details = {}
+    log = io.StringIO()
+
+    try:
+        fingerprints = fingerprint_project(project_dir, cached_fingerprints)
+    except OSError as e:
+        # e.g. a file removed or unreadable between stat and open: only this project fails, not the whole parse,
+        # and without fingerprints it is parsed again next time
+        with contextlib.redirect_stdout(log):
             print("======")
+            print(f'Project: {projectname}')
+            print(f'Failed to read the files of {projectname}. Original error: {e}')
+            add_problem(problems, projectname, 'ALL', f'Failed to read the project files. Original error: {e}')
+            print("======")
+        return projectname, [], details, problems, log.getvalue(), {}
+
+    if cached_fingerprints is not None and {file: f[2] for file, f in fingerprints.items()} == {
+        file: f[2] for file, f in cached_fingerprints.items()
+    }:
+        return projectname, None, details, problems, f'Project: {projectname} (unchanged, using cached results)\n', fingerprints
+
+    with contextlib.redirect_stdout(log):
+        print("======")
+        print(f'Project: {projectname}')
+        try:
+            results = parse_project(project_dir, projectname, problems, details)
+        except Exception as e:
+            print(f'Failed to parse {projectname}. Original error: {e}')
+            add_problem(problems, projectname, 'ALL', f'Failed to parse project. Original error: {e}')
+            results = []
+        print("======")
+
+    return projectname, results, details, problems, log.getvalue(), fingerprints
+
+
+def process_project_task(task):
+    return process_project(*task)
+
+
+def list_project_dirs(reports_dir):
+    return [
+        os.path.join(reports_dir, project)
+        for project in sorted(os.listdir(reports_dir))
+        if os.path.isdir(os.path.join(reports_dir, project)) and 'report' not in project
+    ]
+
+
+def iterate_projects(tasks, jobs):
+    # yield the parsed projects as soon as they are ready, tasks are (project_dir, cached_fingerprints)
+    if jobs <= 1:
+        yield from map(process_project_task, tasks)
+        return
+
+    with multiprocessing.Pool(processes=jobs) as pool:
+        yield from pool.imap_unordered(process_project_task, tasks, chunksize=1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Parse the reports of all the projects into results.csv')
+    parser.add_argument('reports_dir', nargs='?', default='.', help='folder containing one folder per project')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of cores, 1 to run serially)')
+    parser.add_argument('-o', '--output', default='results.csv', help='output csv file')
+    parser.add_argument('--db', default=RESULTS_DB, help='output results store (sqlite), also caches the parsed projects')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the cache and parse every project again')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    problems = {}
+    num_lines = 0
+    num_parsed = 0
+
+    project_dirs = list_project_dirs(args.reports_dir)
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as f, ResultsStore(args.db, reset=args.rebuild) as store:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDNAMES)
+        writer.writeheader()
+
+        projectnames = {os.path.basename(project_dir.rstrip('/')): project_dir for project_dir in project_dirs}
+        store.remove_projects_except(projectnames)
+        cached_fingerprints = store.file_fingerprints()
+
+        # projects whose files were not touched since they were cached are not even sent to the workers
+        tasks = []
+        unchanged = []
+        for projectname, project_dir in projectnames.items():
+            cached = cached_fingerprints.get(projectname)
+            if is_unchanged(stat_project_files(project_dir), cached):
+                unchanged.append((projectname, None, {}, {}, f'Project: {projectname} (unchanged, using cached results)\n', cached))
+            else:
+                tasks.append((project_dir, cached))
+
+        print(f'Parsing {len(tasks)} changed projects with {args.jobs} worker(s), {len(unchanged)} projects unchanged')
+
+        for projectname, results, details, project_problems, log, fingerprints in itertools.chain(
+            unchanged, iterate_projects(tasks, args.jobs)
+        ):
+            sys.stdout.write(log)
+            if results is None:
+                results, project_problems = store.cached_project(projectname)
+                if fingerprints != cached_fingerprints.get(projectname):
+                    # touched but same content, remember the new modification times
+                    store.save_file_fingerprints(projectname, fingerprints)
+            else:
+                num_parsed += 1
+                store.replace_project(projectname, results, details, project_problems.get(projectname, {}))
+                store.save_parse_cache(projectname, fingerprints)
+
+            problems.update(project_problems)
+            for line in results:
+                write_result_line(writer, line)
+            num_lines += len(results)
+            f.flush()
 
     print("\n====== RESULTS CSV ======\n")
-    # print_results_csv(lines)
-    results_csv_file(lines)
-    print('created results.csv')
+    if num_lines == 0:
+        print('No data to write.')
+    print(f'created {args.output} and {args.db} with {num_lines} lines ({num_parsed} projects parsed)')
     print("\n====== PROBLEMS CSV ======\n")
     print_problems_csv(problems)
     print("\n====== PROBLEMS JSON ======\n")
     # print_problems_json(problems)
 
 
-main()
+if __name__ == '__main__':
+    main()
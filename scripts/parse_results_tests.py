@@ -1,14 +1,26 @@
-import json
 import csv
-from typing import Any, Dict, List
+import heapq
+import argparse
+import multiprocessing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import os
 
+from json_stream import JsonStream
+from results_store import RESULTS_DB, ResultsStore
+
 ALGOS = ['ORIGINAL', 'B', 'C', 'C+', 'D']
+BASELINE = 'ORIGINAL'
+MONITORED_ALGOS = [algo for algo in ALGOS if algo != BASELINE]
+TOP_N = 100
 
-def load_json(input_file: str) -> Dict[str, Any]:
-    """Load JSON data from a file."""
-    with open(input_file, "r") as f:
-        return json.load(f)
+HOTSPOT_TESTS_FIELDNAMES = [
+    'algorithm', 'rank', 'project', 'test_name', f'time_{BASELINE}', 'time', 'overhead',
+    'extra_time', 'share', 'cumulative_share',
+]
+HOTSPOT_PROJECTS_FIELDNAMES = [
+    'algorithm', 'rank', 'project', 'tests', f'time_{BASELINE}', 'time', 'overhead',
+    'extra_time', 'share', 'cumulative_share',
+]
 
 def calculate_time_test(test: Dict[str, Any]) -> float:
     """Calculate the total time for a test."""
@@ -19,28 +31,45 @@ def calculate_time_test(test: Dict[str, Any]) -> float:
     ]
     return round(sum(durations), 4)
 
-def extract_test_times(data: Dict[str, Any], algo: str) -> Dict[str, float]:
+def iterate_report_tests(input_file: str) -> Iterator[Dict[str, Any]]:
+    """Yield the tests of a pytest json report one by one, without loading the whole report."""
+    with open(input_file, "r") as f:
+        stream = JsonStream(f)
+        for key in stream.items():
+            if key == "tests":
+                for _ in stream.array_items():
+                    yield stream.value()
+
+def extract_test_times(tests, algo: str) -> Dict[str, float]:
     """Extract test names and their times for a specific algorithm."""
     test_times = {}
-    for test in data.get("tests", []):
+    for test in tests:
         test_name = test.get("nodeid", "N/A")
         time_test = calculate_time_test(test)
         test_times[test_name] = time_test
     return test_times
 
+def calculate_overhead(time_algo: Optional[float], time_baseline: Optional[float]) -> Optional[float]:
+    """Ratio of the time of a test with monitoring to its time without, None if it cannot be computed."""
+    if time_algo is None or not time_baseline or time_baseline <= 0:
+        return None
+    return round(time_algo / time_baseline, 4)
+
 def merge_test_results(project: str, all_test_times: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
     """Combine test times across algorithms into one row per test."""
     merged_results = []
-    all_test_names = set()
+    all_test_names = {}
     for algo_times in all_test_times.values():
-        all_test_names.update(algo_times.keys())
-    
+        all_test_names.update(dict.fromkeys(algo_times))
+
     for test_name in all_test_names:
         row = {"project": project, "test_name": test_name}
         for algo in ALGOS:
             row[f"time_{algo}"] = all_test_times.get(algo, {}).get(test_name, None)
+        for algo in MONITORED_ALGOS:
+            row[f"overhead_{algo}"] = calculate_overhead(row[f"time_{algo}"], row[f"time_{BASELINE}"])
         merged_results.append(row)
-    
+
     return merged_results
 
 def process_project(project: str) -> List[Dict[str, Any]]:
@@ -50,37 +79,162 @@ def process_project(project: str) -> List[Dict[str, Any]]:
         file_path = os.path.join(project, f"{algo}.report.json")
         if os.path.isfile(file_path):
             print(f"Processing file {file_path}")
-            data = load_json(file_path)
-            all_test_times[algo] = extract_test_times(data, algo)
+            try:
+                all_test_times[algo] = extract_test_times(iterate_report_tests(file_path), algo)
+            except ValueError as e:
+                print(f"ERROR: Could not read {file_path}: {e}")
         else:
             print(f"ERROR: File {file_path} not found")
     return merge_test_results(project, all_test_times)
 
-def save_to_csv(merged_results: List[Dict[str, Any]], output_file: str) -> None:
-    """Save merged results to a CSV file."""
+def iterate_projects(projects: List[str], jobs: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the merged rows of each project, in the order of projects."""
+    if jobs <= 1:
+        yield from map(process_project, projects)
+        return
+
+    with multiprocessing.Pool(processes=jobs) as pool:
+        yield from pool.imap(process_project, projects, chunksize=1)
+
+class HotspotTracker:
+    """Keep, per algorithm, the top_n tests and the totals of the time monitoring adds.
+
+    Tests are ranked by the time monitoring adds to them (time with the algorithm
+    minus time with ORIGINAL), so the report shows where the slowdown concentrates
+    and not only the tests with a big ratio on a tiny duration. Only top_n tests per
+    algorithm are kept in memory; projects are aggregated as they come.
+    """
+
+    def __init__(self, top_n: int = TOP_N):
+        self.top_n = top_n
+        self.tests = {algo: [] for algo in MONITORED_ALGOS}  # min-heaps of (extra_time, counter, row)
+        self.projects = {algo: {} for algo in MONITORED_ALGOS}  # {project: [tests, time_baseline, time, extra_time]}
+        self.total_extra_time = {algo: 0.0 for algo in MONITORED_ALGOS}
+        self.counter = 0
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            time_baseline = row[f"time_{BASELINE}"]
+            if time_baseline is None:
+                continue
+            for algo in MONITORED_ALGOS:
+                time_algo = row[f"time_{algo}"]
+                if time_algo is None:
+                    continue
+                extra_time = time_algo - time_baseline
+
+                project = self.projects[algo].setdefault(row["project"], [0, 0.0, 0.0, 0.0])
+                project[0] += 1
+                project[1] += time_baseline
+                project[2] += time_algo
+                project[3] += extra_time
+                self.total_extra_time[algo] += extra_time
+
+                self.counter += 1
+                entry = (extra_time, -self.counter, row)
+                if len(self.tests[algo]) < self.top_n:
+                    heapq.heappush(self.tests[algo], entry)
+                elif entry > self.tests[algo][0]:
+                    heapq.heapreplace(self.tests[algo], entry)
+
+    def _ranked(self, algo: str, entries: List[Tuple[float, Dict[str, Any]]]) -> Iterator[Tuple[int, float, float, float]]:
+        # yield (rank, extra_time, share, cumulative_share) for entries sorted by decreasing extra time
+        total = self.total_extra_time[algo]
+        cumulative = 0.0
+        for rank, (extra_time, _) in enumerate(entries, start=1):
+            cumulative += extra_time
+            share = round(extra_time / total, 4) if total > 0 else None
+            cumulative_share = round(cumulative / total, 4) if total > 0 else None
+            yield rank, round(extra_time, 4), share, cumulative_share
+
+    def test_lines(self) -> Iterator[Dict[str, Any]]:
+        for algo in MONITORED_ALGOS:
+            entries = [(extra_time, row) for extra_time, _, row in sorted(self.tests[algo], reverse=True)]
+            for (rank, extra_time, share, cumulative_share), (_, row) in zip(self._ranked(algo, entries), entries):
+                yield {
+                    'algorithm': algo,
+                    'rank': rank,
+                    'project': row['project'],
+                    'test_name': row['test_name'],
+                    f'time_{BASELINE}': row[f'time_{BASELINE}'],
+                    'time': row[f'time_{algo}'],
+                    'overhead': row[f'overhead_{algo}'],
+                    'extra_time': extra_time,
+                    'share': share,
+                    'cumulative_share': cumulative_share,
+                }
+
+    def project_lines(self) -> Iterator[Dict[str, Any]]:
+        for algo in MONITORED_ALGOS:
+            projects = sorted(self.projects[algo].items(), key=lambda item: (-item[1][3], item[0]))[:self.top_n]
+            entries = [(totals[3], (name, totals)) for name, totals in projects]
+            for (rank, extra_time, share, cumulative_share), (name, totals) in zip(self._ranked(algo, entries), projects):
+                yield {
+                    'algorithm': algo,
+                    'rank': rank,
+                    'project': name,
+                    'tests': totals[0],
+                    f'time_{BASELINE}': round(totals[1], 4),
+                    'time': round(totals[2], 4),
+                    'overhead': calculate_overhead(totals[2], totals[1]),
+                    'extra_time': extra_time,
+                    'share': share,
+                    'cumulative_share': cumulative_share,
+                }
+
+def save_lines(lines, fieldnames: List[str], output_file: str) -> None:
+    """Save lines to a CSV file."""
     with open(output_file, "w", newline="") as csvfile:
-        fieldnames = ["project", "test_name"] + [f"time_{algo}" for algo in ALGOS]
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(merged_results)
+        writer.writerows(lines)
+
+def read_sanity_checked_projects(results_after_sanity: str) -> set:
+    """Get the projects that passed the sanity check, from the results store if there is one."""
+    if os.path.isfile(RESULTS_DB):
+        with ResultsStore(RESULTS_DB) as store:
+            return store.sanity_checked_projects()
 
-def process_folders(results_after_sanity: str) -> None:
-    """Process all projects and generate the final CSV."""
     projects = set()
     with open(results_after_sanity, 'r') as file:
         reader = csv.DictReader(file)
         for row in reader:
             projects.add(row['project'])
+    return projects
 
-    merged_results = []
-    for project in projects:
+def process_folders(results_after_sanity: str, jobs: int = 1, top_n: int = TOP_N) -> None:
+    """Process all projects and generate the final CSV, streaming the rows of each project as it is done."""
+    projects = []
+    for project in sorted(read_sanity_checked_projects(results_after_sanity)):
         if os.path.isdir(project):
             print(f"Processing project {project}")
-            merged_results.extend(process_project(project))
+            projects.append(project)
         else:
             print(f"ERROR: Project folder {project} not found")
 
-    save_to_csv(merged_results, "results_tests.csv")
+    hotspots = HotspotTracker(top_n)
+    with open("results_tests.csv", "w", newline="") as csvfile:
+        fieldnames = ["project", "test_name"] + [f"time_{algo}" for algo in ALGOS] + [f"overhead_{algo}" for algo in MONITORED_ALGOS]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for merged_results in iterate_projects(projects, jobs):
+            writer.writerows(merged_results)
+            hotspots.add(merged_results)
     print(f"Results saved to results_tests.csv")
 
-process_folders("sanity-check-results.csv")
+    save_lines(hotspots.test_lines(), HOTSPOT_TESTS_FIELDNAMES, "hotspots_tests.csv")
+    save_lines(hotspots.project_lines(), HOTSPOT_PROJECTS_FIELDNAMES, "hotspots_projects.csv")
+    print(f"Top {top_n} tests and projects by time added by monitoring saved to hotspots_tests.csv and hotspots_projects.csv")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Merge the per test times of all the algorithms into results_tests.csv')
+    parser.add_argument('results_after_sanity', nargs='?', default='sanity-check-results.csv',
+                        help='sanity checked results, used when there is no results store')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of cores, 1 to run serially)')
+    parser.add_argument('-n', '--top', type=int, default=TOP_N, help=f'number of tests and projects in the hotspot reports (default: {TOP_N})')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    process_folders(args.results_after_sanity, args.jobs, args.top)
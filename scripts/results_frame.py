@@ -0,0 +1,152 @@
+import csv
+import sys
+import operator
+from array import array
+from functools import reduce
+from itertools import compress
+
+from results_store import RESULT_FIELDNAMES, ResultsStore
+
+# Values of an integer column when the cell is empty, and when it is not a number. They are
+# below any number of the column (numbers are clamped above them), so they are never > 0 or == 0.
+EMPTY = -2 ** 63
+INVALID = EMPTY + 1
+MAX_INT = 2 ** 63 - 1
+INT_COLUMNS = ['passed', 'failed', 'skipped', 'xfailed', 'xpassed', 'errors']
+
+
+def to_int(value):
+    """The value of a cell in an integer column, read like the statistics compare the text of the cells:
+    '' is EMPTY, and a zero that is not written '0' (e.g. '00') is INVALID, since it is not == '0'."""
+    if not value:
+        return EMPTY
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return INVALID
+    if number == 0 and value != '0':
+        return INVALID
+    return min(max(number, INVALID + 1), MAX_INT)
+
+
+class AlgorithmColumns:
+    """The columns of the rows of one algorithm: project ids, integer columns and execution problems."""
+
+    def __init__(self):
+        self.project = array('l')
+        self.ints = {column: array('q') for column in INT_COLUMNS}
+        self.execution_problems = []
+
+    def __len__(self):
+        return len(self.project)
+
+
+class ResultsFrame:
+    """Columnar, typed view of the results (results.csv or results.db).
+
+    The file is read once: every project gets an integer id, and the rows are split
+    by algorithm into columns, the integer ones parsed into arrays. A category is a
+    set of project ids computed from masks over the columns of one algorithm (built
+    with map() over the arrays, see where()), then combined with set operations,
+    instead of re-reading the file and re-parsing every row for every category.
+    The rows are only kept as tuples, to write the rows of some projects back.
+    """
+
+    def __init__(self, rows, header):
+        self.header = list(header)
+        self.rows = []
+        self.project_names = []
+        self.project_ids = {}
+        self.columns = {}  # key: algorithm, value: AlgorithmColumns
+        self.projects_by_algorithm = {}  # key: algorithm, value: ids of the projects having a row of it
+        self.rows_by_project = []
+
+        position = {column: index for index, column in enumerate(self.header)}
+        project_at, algorithm_at = position['project'], position['algorithm']
+        problems_at = position.get('execution_problems')
+        int_positions = [(column, position.get(column)) for column in INT_COLUMNS]
+
+        width = len(self.header)
+        for row in rows:
+            row = tuple(row)
+            if len(row) < width:  # short csv lines, like csv.DictReader fills them
+                row += ('',) * (width - len(row))
+            name = row[project_at]
+            project_id = self.project_ids.get(name)
+            if project_id is None:
+                project_id = self.project_ids[name] = len(self.project_names)
+                self.project_names.append(name)
+                self.rows_by_project.append(array('l'))
+            self.rows_by_project[project_id].append(len(self.rows))
+            self.rows.append(row)
+
+            algorithm = row[algorithm_at]
+            columns = self.columns.get(algorithm)
+            if columns is None:
+                columns = self.columns[algorithm] = AlgorithmColumns()
+                self.projects_by_algorithm[algorithm] = set()
+            columns.project.append(project_id)
+            self.projects_by_algorithm[algorithm].add(project_id)
+            columns.execution_problems.append((row[problems_at] if problems_at is not None else '') or '')
+            for column, index in int_positions:
+                columns.ints[column].append(to_int(row[index]) if index is not None else EMPTY)
+
+    @classmethod
+    def from_csv(cls, file_name):
+        csv.field_size_limit(sys.maxsize)
+        with open(file_name, mode='r', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            return cls(reader, header)
+
+    @classmethod
+    def from_store(cls, file_name):
+        # the lines of results.csv, with the same columns in the same order
+        get_row = operator.itemgetter(*RESULT_FIELDNAMES)
+        with ResultsStore(file_name) as store:
+            return cls(map(get_row, store.iter_results()), RESULT_FIELDNAMES)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def algorithms(self):
+        return list(self.columns)
+
+    def row_count(self, algorithm):
+        columns = self.columns.get(algorithm)
+        return len(columns) if columns is not None else 0
+
+    def all_projects(self):
+        return set(range(len(self.project_names)))
+
+    def column(self, algorithm, name):
+        """A column of the rows of algorithm: project (ids), execution_problems or one of INT_COLUMNS."""
+        columns = self.columns.get(algorithm) or AlgorithmColumns()
+        if name == 'project':
+            return columns.project
+        if name == 'execution_problems':
+            return columns.execution_problems
+        return columns.ints[name]
+
+    def where(self, algorithm, *masks, projects=None):
+        """Ids of the projects having a row of algorithm for which every mask is true, restricted to
+        projects if given. A mask is an iterable of one truth value per row of algorithm, typically
+        map() over its columns, e.g. map((0).__lt__, frame.column(algorithm, 'passed')) for passed > 0."""
+        if not masks:
+            selected = set(self.projects_by_algorithm.get(algorithm, ()))
+        else:
+            mask = reduce(lambda a, b: map(operator.and_, a, b), (map(bool, mask) for mask in masks))
+            selected = set(compress(self.column(algorithm, 'project'), mask))
+        if projects is not None:
+            selected &= projects
+        return selected
+
+    def project_set(self, names):
+        """Ids of the given project names that are in the frame."""
+        return {self.project_ids[name] for name in names if name in self.project_ids}
+
+    def project_rows(self, projects):
+        """The rows of the given projects (tuples in the order of header), grouped by project like in the input."""
+        for project_id in sorted(projects):
+            for index in self.rows_by_project[project_id]:
+                yield self.rows[index]
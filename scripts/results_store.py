@@ -0,0 +1,372 @@
+import os
+import sqlite3
+
+RESULTS_DB = 'results.db'
+# A store written with another version of the schema is parsed again from scratch.
+SCHEMA_VERSION = 2
+
+# All the columns a row of results.csv can have, in the order they are filled.
+# The header has to be known upfront because rows are streamed to the file as
+# soon as each project finishes.
+RESULT_FIELDNAMES = [
+    'project', 'algorithm', 'passed', 'failed', 'skipped', 'xfailed', 'xpassed', 'errors', 'time',
+    'execution_problems', 'usage_memory', 'time_instrumentation', 'time_create_monitor', 'test_duration',
+    'end_to_end_time', 'total_violations', 'violations', 'unique_violations_count', 'unique_violations_summary',
+    'unique_violations_test', 'monitors', 'total_monitors', 'events', 'total_events', 'log_file',
+    'comparison_problems',
+]
+
+# Scalar columns of a run (one project with one algorithm). The per-spec data that
+# results.csv packs into strings lives in the monitors, events and violations tables.
+# The time and memory columns have no type affinity: a value reads back as the int,
+# float or text it was stored as, so it is rendered the same way as in results.csv.
+RUN_COLUMNS = [
+    ('project', 'TEXT NOT NULL'),
+    ('algorithm', 'TEXT NOT NULL'),
+    ('passed', 'INTEGER'),
+    ('failed', 'INTEGER'),
+    ('skipped', 'INTEGER'),
+    ('xfailed', 'INTEGER'),
+    ('xpassed', 'INTEGER'),
+    ('errors', 'INTEGER'),
+    ('time', ''),
+    ('execution_problems', 'TEXT'),
+    ('usage_memory', ''),
+    ('time_instrumentation', ''),
+    ('time_create_monitor', ''),
+    ('test_duration', ''),
+    ('end_to_end_time', ''),
+    ('total_violations', 'INTEGER'),
+    ('total_monitors', 'INTEGER'),
+    ('total_events', 'INTEGER'),
+    ('log_file', 'TEXT'),
+    ('comparison_problems', 'TEXT'),
+]
+RUN_COLUMN_NAMES = [name for name, _ in RUN_COLUMNS]
+INSERT_RUN_SQL = (
+    f'INSERT OR REPLACE INTO runs ({", ".join(RUN_COLUMN_NAMES)}) '
+    f'VALUES ({", ".join("?" for _ in RUN_COLUMN_NAMES)})'
+)
+
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS runs (
+    {', '.join(f'{name} {column_type}' for name, column_type in RUN_COLUMNS)},
+    PRIMARY KEY (project, algorithm)
+);
+CREATE TABLE IF NOT EXISTS monitors (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    monitors INTEGER,
+    PRIMARY KEY (project, algorithm, spec)
+);
+CREATE TABLE IF NOT EXISTS events (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    event TEXT NOT NULL,
+    count INTEGER,
+    PRIMARY KEY (project, algorithm, spec, event)
+);
+CREATE TABLE IF NOT EXISTS violation_specs (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    PRIMARY KEY (project, algorithm, spec)
+);
+CREATE TABLE IF NOT EXISTS violations (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    violation TEXT NOT NULL,
+    count INTEGER,
+    PRIMARY KEY (project, algorithm, spec, violation)
+);
+CREATE TABLE IF NOT EXISTS problems (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    problem TEXT
+);
+CREATE INDEX IF NOT EXISTS problems_project ON problems (project, algorithm);
+CREATE TABLE IF NOT EXISTS sanity_check (
+    project TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    test_duration REAL,
+    old_test_duration REAL,
+    PRIMARY KEY (project, algorithm)
+);
+CREATE TABLE IF NOT EXISTS file_fingerprints (
+    project TEXT NOT NULL,
+    file TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    PRIMARY KEY (project, file)
+);
+CREATE TABLE IF NOT EXISTS parse_cache (
+    project TEXT PRIMARY KEY
+);
+'''
+
+PROJECT_TABLES = ['runs', 'monitors', 'events', 'violation_specs', 'violations', 'problems', 'sanity_check']
+CACHE_TABLES = ['parse_cache', 'file_fingerprints']
+
+
+def _as_text(value):
+    # render a value the way it reads in results.csv
+    return '' if value is None else str(value)
+
+
+def pack_violations(spec_violations):
+    """The violations columns of a results.csv line, from {spec: {violation: count}} (like parse_reports writes them)."""
+    return {
+        'violations': ';'.join(f'{spec}={sum(counts.values())}' for spec, counts in spec_violations.items()),
+        'unique_violations_count': ''.join(f'{spec}={len(counts)};' for spec, counts in spec_violations.items()),
+        'unique_violations_summary': str(
+            {spec: dict.fromkeys(counts, 1) for spec, counts in spec_violations.items()}
+        ).replace(",", "<>"),
+        'unique_violations_test': str(
+            {spec: {violation: set() for violation in counts} for spec, counts in spec_violations.items()}
+        ).replace(",", "<>"),
+    }
+
+
+def pack_monitors_and_events(spec_monitors, spec_events):
+    """The monitors and events columns of a results.csv line, from {spec: monitors} and {spec: {event: count}}."""
+    monitors = ''.join(f'{spec}={count}<>' for spec, count in spec_monitors.items())
+    events = ''.join(f'{spec}={event}={count}<>' for spec, events in spec_events.items() for event, count in events.items())
+    return {'monitors': monitors[:-1], 'events': events[:-1]}
+
+
+class ResultsStore:
+    """Normalized, indexed storage of the parsed reports (SQLite).
+
+    One row per run in runs, and one row per spec (and event / violation) in
+    monitors, events and violations, so the statistics can be queried without
+    loading and re-splitting the packed columns of results.csv.
+    """
+
+    def __init__(self, path: str = RESULTS_DB, reset: bool = False):
+        if reset and os.path.isfile(path):
+            os.remove(path)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self._drop_other_schema_version()
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _drop_other_schema_version(self):
+        # everything in the store is parsed from the reports, a store of another version is emptied and parsed again
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        tables = [row['name'] for row in self.query("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        if version != SCHEMA_VERSION and tables:
+            with self.connection:
+                for table in tables:
+                    self.connection.execute(f'DROP TABLE {table}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def replace_project(self, project: str, rows, details, problems):
+        """Store the parsed runs of a project, replacing whatever was stored for it before.
+
+        rows are the results.csv lines of the project, details maps each algorithm to
+        {'monitors': {spec: n}, 'events': {spec: {event: n}}, 'violations': {spec: {violation: n}}}
+        and problems maps each algorithm to its list of problems.
+        """
+        with self.connection:
+            for table in PROJECT_TABLES:
+                self.connection.execute(f'DELETE FROM {table} WHERE project = ?', (project,))
+
+            self.connection.executemany(
+                INSERT_RUN_SQL,
+                [[self._run_value(row.get(name)) for name in RUN_COLUMN_NAMES] for row in rows]
+            )
+
+            for algorithm, algorithm_details in details.items():
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO violation_specs VALUES (?, ?, ?)',
+                    [(project, algorithm, spec) for spec in algorithm_details.get('violations', {})]
+                )
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO monitors VALUES (?, ?, ?, ?)',
+                    [(project, algorithm, spec, count) for spec, count in algorithm_details.get('monitors', {}).items()]
+                )
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)',
+                    [
+                        (project, algorithm, spec, event, count)
+                        for spec, events in algorithm_details.get('events', {}).items()
+                        for event, count in events.items()
+                    ]
+                )
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO violations VALUES (?, ?, ?, ?, ?)',
+                    [
+                        (project, algorithm, spec, violation, count)
+                        for spec, violations in algorithm_details.get('violations', {}).items()
+                        for violation, count in violations.items()
+                    ]
+                )
+
+            self.connection.executemany(
+                'INSERT INTO problems VALUES (?, ?, ?)',
+                [
+                    (project, algorithm, problem)
+                    for algorithm, algorithm_problems in problems.items()
+                    for problem in algorithm_problems
+                ]
+            )
+
+    @staticmethod
+    def _run_value(value):
+        return None if value == '' else value
+
+    def query(self, sql: str, params=()):
+        return self.connection.execute(sql, params).fetchall()
+
+    def read_runs(self, where: str = '', params=(), as_text: bool = False):
+        """Return the runs as dicts, optionally filtered by an SQL where clause.
+
+        With as_text the values are rendered like in results.csv ('' for missing
+        values), so code written against csv.DictReader rows keeps working.
+        """
+        sql = 'SELECT * FROM runs'
+        if where:
+            sql += f' WHERE {where}'
+        sql += ' ORDER BY project, rowid'
+
+        runs = []
+        for row in self.query(sql, params):
+            run = dict(row)
+            if as_text:
+                run = {key: _as_text(value) for key, value in run.items()}
+            runs.append(run)
+        return runs
+
+    def packed_columns(self, project: str):
+        """Return {algorithm: {column: text}} with the columns that results.csv packs the per-spec data of
+        the runs of a project into (violations, unique_violations_*, monitors and events), rebuilt from the
+        monitors, events and violations tables. A run without -violations.json or -full.json has none of
+        them, like in results.csv.
+        """
+        spec_violations = {}  # key: algorithm, value: {spec: {violation: count}}
+        for row in self.query('SELECT algorithm, spec FROM violation_specs WHERE project = ? ORDER BY rowid', (project,)):
+            spec_violations.setdefault(row['algorithm'], {})[row['spec']] = {}
+        for row in self.query(
+            'SELECT algorithm, spec, violation, count FROM violations WHERE project = ? ORDER BY rowid', (project,)
+        ):
+            spec_violations.setdefault(row['algorithm'], {}).setdefault(row['spec'], {})[row['violation']] = row['count']
+
+        spec_monitors = {}  # key: algorithm, value: {spec: monitors}
+        for row in self.query('SELECT algorithm, spec, monitors FROM monitors WHERE project = ? ORDER BY rowid', (project,)):
+            spec_monitors.setdefault(row['algorithm'], {})[row['spec']] = row['monitors']
+        spec_events = {}  # key: algorithm, value: {spec: {event: count}}
+        for row in self.query(
+            'SELECT algorithm, spec, event, count FROM events WHERE project = ? ORDER BY rowid', (project,)
+        ):
+            spec_events.setdefault(row['algorithm'], {}).setdefault(row['spec'], {})[row['event']] = row['count']
+
+        columns = {}
+        # the totals are only set when the json file was read
+        for run in self.query(
+            'SELECT algorithm, total_violations, total_monitors FROM runs WHERE project = ?', (project,)
+        ):
+            algorithm = run['algorithm']
+            packed = columns[algorithm] = {}
+            if run['total_violations'] is not None:
+                packed.update(pack_violations(spec_violations.get(algorithm, {})))
+            if run['total_monitors'] is not None:
+                packed.update(pack_monitors_and_events(spec_monitors.get(algorithm, {}), spec_events.get(algorithm, {})))
+        return columns
+
+    def read_results(self, project: str):
+        """Return the runs of a project as the lines of results.csv: dicts with the columns of RESULT_FIELDNAMES,
+        rendered as text, the packed columns included (see packed_columns)."""
+        packed = self.packed_columns(project)
+        results = []
+        for run in self.query('SELECT * FROM runs WHERE project = ? ORDER BY rowid', (project,)):
+            line = dict.fromkeys(RESULT_FIELDNAMES, '')
+            line.update((name, _as_text(run[name])) for name in RUN_COLUMN_NAMES)
+            line.update(packed[run['algorithm']])
+            results.append(line)
+        return results
+
+    def iter_results(self):
+        """Yield the lines of results.csv (see read_results) of all the projects, project by project."""
+        for row in self.query('SELECT DISTINCT project FROM runs ORDER BY project'):
+            yield from self.read_results(row['project'])
+
+    def runs_by_project(self, where: str = '', params=(), as_text: bool = False):
+        projects = {}
+        for run in self.read_runs(where, params, as_text):
+            projects.setdefault(run['project'], []).append(run)
+        return projects
+
+    def save_sanity_check(self, projects):
+        """Record the runs that passed the sanity check, with their adjusted test duration."""
+        with self.connection:
+            self.connection.execute('DELETE FROM sanity_check')
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO sanity_check VALUES (?, ?, ?, ?)',
+                [
+                    (project, line['algorithm'], self._run_value(line['test_duration']), self._run_value(line['old_test_duration']))
+                    for project, lines in projects.items()
+                    for line in lines
+                ]
+            )
+
+    def sanity_checked_projects(self):
+        return {row['project'] for row in self.query('SELECT DISTINCT project FROM sanity_check')}
+
+    def file_fingerprints(self):
+        """Return {project: {file: (size, mtime_ns, sha256)}} for the projects that have a cached parse."""
+        fingerprints = {row['project']: {} for row in self.query('SELECT project FROM parse_cache')}
+        for row in self.query('SELECT project, file, size, mtime_ns, sha256 FROM file_fingerprints'):
+            if row['project'] in fingerprints:
+                fingerprints[row['project']][row['file']] = (row['size'], row['mtime_ns'], row['sha256'])
+        return fingerprints
+
+    def cached_project(self, project: str):
+        """Return the (results, problems) stored for a project that has a cached parse, or None.
+
+        results are the results.csv lines of the project (see read_results) and problems is
+        {project: {algorithm: [problem]}}, or {} when the project had no problem.
+        """
+        if not self.query('SELECT project FROM parse_cache WHERE project = ?', (project,)):
+            return None
+        problems = {}
+        for row in self.query('SELECT algorithm, problem FROM problems WHERE project = ? ORDER BY rowid', (project,)):
+            problems.setdefault(project, {}).setdefault(row['algorithm'], []).append(row['problem'])
+        return self.read_results(project), problems
+
+    def save_parse_cache(self, project: str, fingerprints):
+        """Remember that the stored runs of a project were parsed from the files with these fingerprints."""
+        with self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO parse_cache VALUES (?)', (project,))
+            self.save_file_fingerprints(project, fingerprints)
+
+    def save_file_fingerprints(self, project: str, fingerprints):
+        with self.connection:
+            self.connection.execute('DELETE FROM file_fingerprints WHERE project = ?', (project,))
+            self.connection.executemany(
+                'INSERT INTO file_fingerprints VALUES (?, ?, ?, ?, ?)',
+                [(project, file, *fingerprint) for file, fingerprint in fingerprints.items()]
+            )
+
+    def remove_projects_except(self, projects):
+        """Forget the projects that are not in projects anymore."""
+        projects = set(projects)
+        stored = {row['project'] for row in self.query('SELECT project FROM runs UNION SELECT project FROM parse_cache')}
+        with self.connection:
+            for project in stored - projects:
+                for table in PROJECT_TABLES + CACHE_TABLES:
+                    self.connection.execute(f'DELETE FROM {table} WHERE project = ?', (project,))
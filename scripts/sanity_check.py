@@ -1,15 +1,24 @@
+import os
 import csv
 import json
 import sys
 
-csv.field_size_limit(sys.maxsize)
+from results_store import RESULTS_DB, RESULT_FIELDNAMES, ResultsStore
 
 
 def read_csv_to_list_dict(file_name):
+    # the cells with the per-spec data can be megabytes long
+    csv.field_size_limit(sys.maxsize)
     with open(file_name) as file:
         reader = csv.DictReader(file)
         return list(reader)
 
+def read_results_store(file_name):
+    # the runs in the layout of results.csv, the columns with the per-spec data are only
+    # filled in from the store when sanity-check-results.csv is written (see save_new_csv)
+    with ResultsStore(file_name) as store:
+        return [dict(dict.fromkeys(RESULT_FIELDNAMES, ''), **run) for run in store.read_runs(as_text=True)]
+
 def find_missing_required_algo(project_lines, name, required_algos):
     # return an array of the missing required algorithm
     missing = []
@@ -48,7 +57,7 @@ def is_results_diff(lines, name):
     return False
 
 
-def sanity_check(lines):
+def sanity_check(lines, store_file=None):
     # lopp through all lines, create a dict by project and add the lines to the dict
     projects = {}
     successful_projects = {}
@@ -119,8 +128,16 @@ def sanity_check(lines):
 
     file_name = 'sanity-check-results.csv'
     successful_projects = update_test_duration(successful_projects)
-    save_new_csv(file_name, successful_projects, original_keys)
-    print("saved new csv, file name: sanity-check-results.csv")
+
+    if store_file is None:
+        save_new_csv(file_name, successful_projects, original_keys)
+        print("saved new csv, file name: sanity-check-results.csv")
+    else:
+        with ResultsStore(store_file) as store:
+            save_new_csv(file_name, successful_projects, original_keys, store)
+            print("saved new csv, file name: sanity-check-results.csv")
+            store.save_sanity_check(successful_projects)
+        print(f"saved the sanity checked runs in {store_file}")
 
 
 def update_test_duration(lines):
@@ -139,7 +156,7 @@ def update_test_duration(lines):
                 l['test_duration'] = round(t + t_i, 2)
     return lines
 
-def save_new_csv(file_name, new_projects, original_keys):
+def save_new_csv(file_name, new_projects, original_keys, store=None):
     new_keys = list(original_keys)
     new_keys.append('old_test_duration')
     original_keys = new_keys
@@ -149,13 +166,19 @@ def save_new_csv(file_name, new_projects, original_keys):
         writer = csv.DictWriter(file, fieldnames=fieldnames)
         writer.writeheader()
         for p in new_projects:
+            # the packed per-spec columns are rebuilt from the store, one project at a time
+            packed = store.packed_columns(p) if store is not None else {}
             for line in new_projects[p]:
-                writer.writerow(line)
+                writer.writerow(dict(line, **packed.get(line['algorithm'], {})))
 
 
 def main():
-    lines = read_csv_to_list_dict("results.csv")
-    sanity_check(lines)
+    if os.path.isfile(RESULTS_DB):
+        lines = read_results_store(RESULTS_DB)
+        sanity_check(lines, RESULTS_DB)
+    else:
+        lines = read_csv_to_list_dict("results.csv")
+        sanity_check(lines)
 
 
 main()
@@ -8,25 +8,7 @@ import pythonmop.spec.spec as spec
 spec.DONT_MONITOR_PYTHONMOP = False
 StatisticsSingleton().set_full_statistics()
 
-parser = argparse.ArgumentParser("Fake Program")
-parser.add_argument("algo", help="The algorithm to run", type=str, choices=['A', 'B', 'C', 'C+', 'D'])
-parser.add_argument("instance_count", help="The number of instances", type=int)
-parser.add_argument("event_count", help="The number of events", type=int)
-parser.add_argument("creation_event_percent", help="The percentage of time creation event will be called", type=int)
-parser.add_argument("enable_event_percent", help="The percentage of time enable event is called", type=int)
-args = parser.parse_args()
-
-# Replace the argparse section with this:
-# class FakeArgs:
-#     def __init__(self):
-#         self.algo = 'B'
-#         self.instance_count = 200
-#         self.event_count = 10
-#         self.creation_event_percent = 100
-#         self.enable_event_percent = 100
-
-# args = FakeArgs()
-
+SPEC_NAME = 'UnsafeMapIterator'
 
 original_print = builtins.print
 def mock_print():
@@ -129,11 +111,11 @@ class UnsafeMapIterator(Spec):
             f'Spec - {self.__class__.__name__}: Should not call next on iterator after modifying the map . file {call_file_name}, line {call_line_num}.')
 # =========================================================================
 
-def execute_fake_program(instance_count, event_count):
+def execute_fake_program(algo, instance_count, event_count, creation_event_percent, enable_event_percent):
     map_instances = []
     iter_instances = []
 
-    creation_event_start_index = int((1 - (args.creation_event_percent / 100)) * instance_count)
+    creation_event_start_index = int((1 - (creation_event_percent / 100)) * instance_count)
 
     for i in range(instance_count):
         # these creation events won't be considered as they're created before the spec is created
@@ -141,9 +123,10 @@ def execute_fake_program(instance_count, event_count):
             d = dict(a=1, b=2, c=3)
             map_instances.append(d)
 
-    # create a spec
-    the_spec = UnsafeMapIterator()
-    the_spec.create_monitor(args.algo)
+    # create a spec, unless algo is None (an unmonitored warmup run)
+    if algo is not None:
+        the_spec = UnsafeMapIterator()
+        the_spec.create_monitor(algo)
 
     for i in range(instance_count):
         # 30% of the time call the creation event
@@ -159,7 +142,7 @@ def execute_fake_program(instance_count, event_count):
     # 15% of the time call the enabling event (that is part of the enable set of d)
     # [so that 85% of the time algo D would skip creating a monitor]
     for i, d in enumerate(map_instances):
-        if i > (1 - (args.enable_event_percent / 100)) * len(map_instances):
+        if i > (1 - (enable_event_percent / 100)) * len(map_instances):
             del d['a']
             d['d'] = 4
 
@@ -167,34 +150,51 @@ def execute_fake_program(instance_count, event_count):
     for iterator in iter_instances:
         next(iterator)
 
-    if args.algo == 'A':
+    if algo == 'A':
         the_spec.get_monitor().refresh_monitor()
 
 
-mock_print()
-time_1 = time.time()
-execute_fake_program(args.instance_count, args.event_count)
-time_2 = time.time()
-unmock_print()
-
-print(f'Running: algo {args.algo} Instance: {args.instance_count} Requested Events {args.event_count} Creation Events {args.creation_event_percent}% Enable Events {args.enable_event_percent}%')
-try:
-    # get the count of all events by summing the values of all keys within events dict within StringTemplate_ChangeAfterCreate
-    events = StatisticsSingleton().full_statistics_dict['UnsafeMapIterator']['events']
-    event_count = sum(events.values())
-    print('Registered Event count:', event_count)
-except KeyError:
-    print('Registered Event count: 0')
-try:
-    print('Monitor Count: ', StatisticsSingleton().full_statistics_dict['UnsafeMapIterator']['monitors'])
-except KeyError:
-    print('Monitor Count: 0')
+def run(algo, instance_count, event_count, creation_event_percent, enable_event_percent):
+    """Run the fake program once and return the elapsed time in nanoseconds."""
+    mock_print()
+    try:
+        time_1 = time.perf_counter_ns()
+        execute_fake_program(algo, instance_count, event_count, creation_event_percent, enable_event_percent)
+        time_2 = time.perf_counter_ns()
+    finally:
+        unmock_print()
+    return time_2 - time_1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Fake Program")
+    parser.add_argument("algo", help="The algorithm to run", type=str, choices=['A', 'B', 'C', 'C+', 'D'])
+    parser.add_argument("instance_count", help="The number of instances", type=int)
+    parser.add_argument("event_count", help="The number of events", type=int)
+    parser.add_argument("creation_event_percent", help="The percentage of time creation event will be called", type=int)
+    parser.add_argument("enable_event_percent", help="The percentage of time enable event is called", type=int)
+    args = parser.parse_args()
+
+    elapsed = run(args.algo, args.instance_count, args.event_count, args.creation_event_percent, args.enable_event_percent)
+
+    print(f'Running: algo {args.algo} Instance: {args.instance_count} Requested Events {args.event_count} Creation Events {args.creation_event_percent}% Enable Events {args.enable_event_percent}%')
+    try:
+        # get the count of all events by summing the values of all keys within events dict within UnsafeMapIterator
+        events = StatisticsSingleton().full_statistics_dict[SPEC_NAME]['events']
+        event_count = sum(events.values())
+        print('Registered Event count:', event_count)
+    except KeyError:
+        print('Registered Event count: 0')
+    try:
+        print('Monitor Count: ', StatisticsSingleton().full_statistics_dict[SPEC_NAME]['monitors'])
+    except KeyError:
+        print('Monitor Count: 0')
 
-print('Time:', time_2 - time_1)
+    print('Time:', elapsed / 1e9)
 
-print('***************************************')
+    print('***************************************')
 
 
-# print('Full statistics:')
+    # print('Full statistics:')
 
-# print(json.dumps(StatisticsSingleton().full_statistics_dict, indent=2))
\ No newline at end of file
+    # print(json.dumps(StatisticsSingleton().full_statistics_dict, indent=2))
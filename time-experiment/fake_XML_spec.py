@@ -11,24 +11,9 @@ import pythonmop.spec.spec as spec
 
 spec.DONT_MONITOR_PYTHONMOP = False
 StatisticsSingleton().set_full_statistics()
-random.seed(99)
-
-parser = argparse.ArgumentParser("Fakse Program")
-parser.add_argument("algo", help="The algorithm to run", type=str, choices=['A', 'B', 'C', 'C+', 'D'])
-parser.add_argument("instance_count", help="The number of instances", type=int)
-parser.add_argument("event_count", help="The number of events", type=int)
-# args = parser.parse_args()
-
-
-# Replace the argparse section with this:
-class FakeArgs:
-    def __init__(self):
-        self.algo = 'C+'
-        self.instance_count = 100
-        self.event_count = 1000
-
-args = FakeArgs()
+SEED = 99
 
+SPEC_NAME = 'XMLParser_ParseMustFinalize'
 
 
 original_print = builtins.print
@@ -149,10 +134,12 @@ class XMLParser_ParseMustFinalize(Spec):
 
 
 
-def execute_fake_program(instance_count, event_count):
-    # create a spec
-    string_template_instance = XMLParser_ParseMustFinalize()
-    string_template_instance.create_monitor(args.algo)
+def execute_fake_program(algo, instance_count, event_count, creation_event_percent=100, enable_event_percent=100):
+    # the events are picked at random, the creation and enable percentages are not used
+    # create a spec, unless algo is None (an unmonitored warmup run)
+    if algo is not None:
+        string_template_instance = XMLParser_ParseMustFinalize()
+        string_template_instance.create_monitor(algo)
 
     # create instances
     all_instances = []
@@ -181,20 +168,37 @@ def execute_fake_program(instance_count, event_count):
             inst.Parse('<root>', isFinal=True)
             inst.Parse('<root>', isFinal=False)
             End().end_execution()
-    if args.algo == 'A':
+    if algo == 'A':
         string_template_instance.get_monitor().refresh_monitor()
 
 
-mock_print()
-time_1 = time.time()
-# cProfile.run('execute_fake_program(args.instance_count, args.event_count)', sort='cumulative')
-execute_fake_program(args.instance_count, args.event_count)
-time_2 = time.time()
-unmock_print()
-
-print('Algo: ', args.algo)
-print('Instance Count: ', args.instance_count)
-print('Event Count: ', args.event_count)
-print('Time:', time_2 - time_1)
-print('Full statistics:')
-print(json.dumps(StatisticsSingleton().full_statistics_dict, indent=2))
+def run(algo, instance_count, event_count, creation_event_percent=100, enable_event_percent=100):
+    """Run the fake program once and return the elapsed time in nanoseconds."""
+    # every run picks the same events
+    random.seed(SEED)
+    mock_print()
+    try:
+        time_1 = time.perf_counter_ns()
+        # cProfile.run('execute_fake_program(algo, instance_count, event_count)', sort='cumulative')
+        execute_fake_program(algo, instance_count, event_count, creation_event_percent, enable_event_percent)
+        time_2 = time.perf_counter_ns()
+    finally:
+        unmock_print()
+    return time_2 - time_1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Fake Program")
+    parser.add_argument("algo", help="The algorithm to run", type=str, choices=['A', 'B', 'C', 'C+', 'D'], nargs='?', default='C+')
+    parser.add_argument("instance_count", help="The number of instances", type=int, nargs='?', default=100)
+    parser.add_argument("event_count", help="The number of events", type=int, nargs='?', default=1000)
+    args = parser.parse_args()
+
+    elapsed = run(args.algo, args.instance_count, args.event_count)
+
+    print('Algo: ', args.algo)
+    print('Instance Count: ', args.instance_count)
+    print('Event Count: ', args.event_count)
+    print('Time:', elapsed / 1e9)
+    print('Full statistics:')
+    print(json.dumps(StatisticsSingleton().full_statistics_dict, indent=2))
@@ -0,0 +1,212 @@
+import os
+import csv
+import json
+import argparse
+import importlib
+import itertools
+import statistics
+import multiprocessing
+
+SCENARIOS = ['FakeSpec', 'StringTemplate', 'UnsafeMapIterator', 'fake_XML_spec']
+ALGORITHMS = ['A', 'B', 'C', 'C+', 'D']
+
+# trials are forked from a process that already imported the scenario
+CONTEXT = multiprocessing.get_context('fork')
+
+RESULT_FIELDNAMES = [
+    'algo', 'instance_count', 'requested_event_count', 'creation_event_percent', 'enable_event_percent',
+    'registered_event_count', 'monitor_count', 'time',
+    'scenario', 'trials', 'failed_trials', 'time_median_ns', 'time_mean_ns', 'time_stdev_ns',
+    'time_min_ns', 'time_max_ns', 'time_iqr_ns',
+]
+
+
+def _trial_main(module, config, warmups, connection):
+    # runs in the forked trial process, the warmups run the program without a spec and are discarded
+    for _ in range(warmups):
+        module.run(None, *config[1:])
+    module.StatisticsSingleton().full_statistics_dict.pop(module.SPEC_NAME, None)
+
+    elapsed = module.run(*config)
+    statistics_dict = module.StatisticsSingleton().full_statistics_dict.get(module.SPEC_NAME, {})
+    registered_event_count = sum(statistics_dict.get('events', {}).values())
+    monitor_count = statistics_dict.get('monitors', 0)
+    connection.send((elapsed, registered_event_count, monitor_count))
+    connection.close()
+
+
+def run_trial(module, config, warmups):
+    """Run the scenario once with config in a fresh process, return (elapsed_ns, registered_event_count, monitor_count).
+
+    A spec instruments the monitored methods for the whole process and the statistics
+    are a singleton, so two monitored runs cannot share a process. The trial process
+    is forked from the scenario process, so it costs a fork instead of starting python3
+    and importing pythonmop again. Nothing a previous trial ran is inherited, so the trial
+    process first runs the program warmups times without a spec, discarded, before the
+    measured monitored run. Returns None if the trial crashed.
+    """
+    receiver, sender = CONTEXT.Pipe(duplex=False)
+    process = CONTEXT.Process(target=_trial_main, args=(module, config, warmups, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = None
+    process.join()
+    receiver.close()
+    return result
+
+
+def _scenario_main(scenario, configs, warmups, trials, connection):
+    # runs in its own process: importing a scenario patches builtins and monkey-patches classes
+    module = importlib.import_module(scenario)
+    samples = {config: [] for config in configs}
+    counts = {}
+    failed = {config: 0 for config in configs}
+
+    for _ in range(trials):
+        # one trial of every config per round, so slow drifts of the machine spread over all configs
+        for config in configs:
+            result = run_trial(module, config, warmups)
+            if result is None:
+                failed[config] += 1
+                continue
+            elapsed, registered_event_count, monitor_count = result
+            samples[config].append(elapsed)
+            counts[config] = (registered_event_count, monitor_count)
+
+    connection.send((samples, counts, failed))
+    connection.close()
+
+
+def run_scenario(scenario, configs, warmups, trials):
+    """Run the trials, each after its warmups, of every config of a scenario, return ({config: [elapsed_ns]}, {config: counts}, {config: failed})."""
+    receiver, sender = CONTEXT.Pipe(duplex=False)
+    process = CONTEXT.Process(target=_scenario_main, args=(scenario, configs, warmups, trials, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f'Scenario {scenario} crashed, run "python3 {scenario}.py" to see the error')
+    process.join()
+    receiver.close()
+    return result
+
+
+def summarize(samples):
+    median = statistics.median(samples)
+    if len(samples) > 1:
+        quartiles = statistics.quantiles(samples, n=4)
+        stdev = statistics.stdev(samples)
+        iqr = quartiles[2] - quartiles[0]
+    else:
+        stdev = iqr = 0
+    return {
+        'time': median / 1e9,
+        'time_median_ns': int(median),
+        'time_mean_ns': int(statistics.fmean(samples)),
+        'time_stdev_ns': int(stdev),
+        'time_min_ns': min(samples),
+        'time_max_ns': max(samples),
+        'time_iqr_ns': int(iqr),
+    }
+
+
+def build_configs(args):
+    # (algo, instance_count, event_count, creation_event_percent, enable_event_percent), the algorithm varies fastest
+    return [
+        (algo, instance_count, event_count, creation_event_percent, enable_event_percent)
+        for instance_count, event_count, creation_event_percent, enable_event_percent, algo in itertools.product(
+            args.instance_counts, args.event_counts, args.creation_event_percents, args.enable_event_percents, args.algorithms
+        )
+    ]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time the monitoring algorithms on the fake programs.')
+    parser.add_argument('--scenarios', nargs='+', default=['FakeSpec'],
+                        help=f'Fake programs to run, among {", ".join(SCENARIOS)} (default: FakeSpec).')
+    parser.add_argument('--algorithms', nargs='+', default=ALGORITHMS, choices=ALGORITHMS, help='Algorithms to run.')
+    parser.add_argument('--instance-counts', nargs='+', type=int, default=[10, 50, 100], help='Numbers of instances.')
+    parser.add_argument('--event-counts', nargs='+', type=int, default=[10, 20, 30], help='Numbers of events.')
+    parser.add_argument('--creation-event-percents', nargs='+', type=int, default=[100, 50, 0],
+                        help='Percentages of instances receiving the creation event.')
+    parser.add_argument('--enable-event-percents', nargs='+', type=int, default=[100, 50, 0],
+                        help='Percentages of instances receiving the enable event.')
+    parser.add_argument('--warmups', type=int, default=1,
+                        help='Unmonitored runs discarded at the start of each trial process (default: 1).')
+    parser.add_argument('--trials', type=int, default=5,
+                        help='Measured trials per configuration, each in a fresh process (default: 5).')
+    parser.add_argument('-o', '--output', default='time-experiment-results.csv',
+                        help='Summary csv, the samples are saved next to it as json (default: time-experiment-results.csv).')
+    args = parser.parse_args()
+
+    # accept the file names (FakeSpec.py) as well as the module names
+    args.scenarios = [scenario[:-3] if scenario.endswith('.py') else scenario for scenario in args.scenarios]
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f'unknown scenario {scenario}, choose among {", ".join(SCENARIOS)}')
+    if args.warmups < 0:
+        parser.error('--warmups must be at least 0')
+    if args.trials < 1:
+        parser.error('--trials must be at least 1')
+    return args
+
+
+def main():
+    args = parse_args()
+    configs = build_configs(args)
+    print(f'Running {len(configs)} configurations of {", ".join(args.scenarios)} with {args.trials} trial(s) each, after {args.warmups} warmup(s) per trial')
+
+    lines = []
+    raw_samples = []
+    for scenario in args.scenarios:
+        samples, counts, failed = run_scenario(scenario, configs, args.warmups, args.trials)
+        for config in configs:
+            algo, instance_count, event_count, creation_event_percent, enable_event_percent = config
+            raw_samples.append({
+                'scenario': scenario,
+                'algo': algo,
+                'instance_count': instance_count,
+                'requested_event_count': event_count,
+                'creation_event_percent': creation_event_percent,
+                'enable_event_percent': enable_event_percent,
+                'time_ns': samples[config],
+            })
+            if not samples[config]:
+                print(f'All the trials of {scenario} {config} failed')
+                continue
+
+            registered_event_count, monitor_count = counts[config]
+            line = {
+                'algo': algo,
+                'instance_count': instance_count,
+                'requested_event_count': event_count,
+                'creation_event_percent': creation_event_percent,
+                'enable_event_percent': enable_event_percent,
+                'registered_event_count': registered_event_count,
+                'monitor_count': monitor_count,
+                'scenario': scenario,
+                'trials': len(samples[config]),
+                'failed_trials': failed[config],
+                **summarize(samples[config]),
+            }
+            lines.append(line)
+            print(','.join(str(line[name]) for name in RESULT_FIELDNAMES))
+
+    with open(args.output, 'w') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(lines)
+
+    samples_file = os.path.splitext(args.output)[0] + '.json'
+    with open(samples_file, 'w') as f:
+        json.dump(raw_samples, f, indent=2)
+
+    print(f'Saved {args.output} and {samples_file}')
+
+
+if __name__ == '__main__':
+    main()